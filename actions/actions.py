@@ -1,40 +1,40 @@
+import asyncio
+import contextvars
+import hashlib
 import logging
 import json
-import subprocess
-import os
-import fitz 
-from typing import Any, Text, Dict, List
-from datetime import datetime, timedelta
+from typing import Any, Text, Dict, List, NamedTuple, Optional
+from datetime import date, datetime, time, timedelta
 
 from rasa_sdk import Action, Tracker, FormValidationAction
 from rasa_sdk.executor import CollectingDispatcher
-from rasa_sdk.events import SlotSet, AllSlotsReset, FollowupAction, ActiveLoop
+from rasa_sdk.events import SlotSet, AllSlotsReset, FollowupAction
 from rasa_sdk.types import DomainDict
 
-import google.generativeai as genai
-print(f"DEBUG: Loaded google.generativeai from: {genai.__file__}") 
-
 from dotenv import load_dotenv
 
-import re
-
-import requests 
-
 
 load_dotenv()
 
-logger = logging.getLogger(__name__)
+from actions.availability import first_available, get_available_slots, get_available_slots_batch, invalidate_slots
+from actions.date_parser import DateRange, parse_date_expression
+from actions.conversation_context import DAY_NAMES_PLURAL, conversation_contexts, day_of_week, format_days, get_specialty_doctors
+from actions.db_client import get_async_db_client
+from actions.entity_extractor import extract_entities, get_gazetteer
+from actions.knowledge_base import get_knowledge_base
+from actions.llm_cache import get_response_cache
+from actions.llm_gateway import LLMUnavailableError, get_llm_gateway
+from actions.prompts import EXTRACT_INFO_PROMPT, GENERAL_QUESTION_PROMPT, PDF_QUESTION_PROMPT
+from actions.reference_data import get_specialties
+from actions.slot_matcher import resolve_slot
+from actions.streaming import should_stream, start_stream, stream_message
 
-DATABASE_API_URL = os.getenv("DATABASE_API_URL", "http://localhost:3000")
+logger = logging.getLogger(__name__)
 
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    logger.error("Chave de API do Gemini não encontrada. Verifique seu arquivo .env")
-    gemini_model = None
-else:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+# Todas as chamadas ao modelo passam pelo gateway (concorrência, prazos e circuit breaker).
+# O modelo do Gemini só é configurado na primeira chamada, para não atrasar o startup.
+llm_gateway = get_llm_gateway()
 
 
 class ActionHandleGeneralQuestion(Action):
@@ -42,147 +42,133 @@ class ActionHandleGeneralQuestion(Action):
     def name(self) -> Text:
         return "action_handle_general_question"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
-        if not gemini_model:
+    # Incrementar sempre que o prompt mudar, para não servir respostas do prompt antigo do cache
+    PROMPT_VERSION = "2"
+
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
+        user_message = tracker.latest_message.get('text') or ""
+        # Mensagens sem texto (ex.: só um payload) não têm pergunta para responder nem chave de cache
+        if not user_message.strip():
             dispatcher.utter_message(response="utter_default")
             return []
 
-        user_message = tracker.latest_message.get('text')
-        
-        prompt = f"""
-        Você é um assistente virtual de uma clínica chamada "Clínica Super Saudável".
-        Sua função primária é agendar consultas. Responda a perguntas gerais sobre saúde de forma prestativa, mas NUNCA forneça diagnósticos.
-        Se o usuário perguntar algo que você não sabe ou que pareça um pedido de diagnóstico, guie-o a marcar uma consulta.
-        Pergunta do Usuário: "{user_message}"
-        Sua Resposta:
-        """
+        cached_answer = get_response_cache().get(user_message, self.PROMPT_VERSION)
+        if cached_answer is not None:
+            dispatcher.utter_message(text=cached_answer)
+            return []
+
+        if not llm_gateway.available:
+            dispatcher.utter_message(response="utter_default")
+            return []
+
+        prompt = GENERAL_QUESTION_PROMPT.build(question=user_message)
+        if should_stream(tracker):
+            # A resposta segue em streaming; o frontend lê os trechos em /stream/<id>
+            stream_id = start_stream(
+                llm_gateway.stream(prompt, label="general_question"),
+                on_complete=lambda answer: get_response_cache().set(user_message, self.PROMPT_VERSION, answer),
+            )
+            dispatcher.utter_message(json_message=stream_message(stream_id))
+            return []
+
         try:
-            response = gemini_model.generate_content(prompt)
-            dispatcher.utter_message(text=response.text)
+            # Perguntas iguais feitas ao mesmo tempo compartilham uma única chamada ao Gemini
+            answer = await get_response_cache().generate_shared(
+                user_message, self.PROMPT_VERSION, lambda: llm_gateway.generate(prompt, label="general_question")
+            )
+            dispatcher.utter_message(text=answer)
         except Exception as e:
             logger.error(f"Erro ao chamar a API do Gemini: {e}")
             dispatcher.utter_message(response="utter_default")
         return []
 
 
+class Extraction(NamedTuple):
+    """Resultado da extração: slots, se o Gemini foi chamado e a falha ("unavailable", "invalid_json" ou "error")."""
+    slots: Dict[Text, Any]
+    llm_called: bool
+    error: Optional[Text]
+
+
 class ActionExtractInfoWithGemini(Action):
     def name(self) -> Text:
         return "action_extract_info_with_gemini"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
-        if not gemini_model:
-            dispatcher.utter_message(text="Desculpe, estou com problemas técnicos. Vamos tentar de outra forma.")
-            return [FollowupAction("formulario_agendamento")]
-
-        user_message = tracker.latest_message.get('text')
+    # Entidade pedida ao Gemini -> slot do formulário
+    GEMINI_ENTITY_SLOTS = {
+        "especialidade": "especialidade",
+        "nome_doutor": "doctor_name",
+        "data_preferida": "data_preferida",
+        "nome_paciente": "nome_paciente",
+        "email": "email",
+    }
 
-        prompt = f"""
-        Analise a frase do usuário e extraia as seguintes informações em formato JSON. Se uma informação não estiver presente, use "null".
-        Entidades: especialidade, nome_doutor, data_preferida, nome_paciente, email.
-        Frase: "{user_message}"
-        JSON:
-        """
+    @classmethod
+    async def extract(cls, user_message: Text, gazetteer: Any) -> Extraction:
+        """Extrai os slots do agendamento de uma frase; usado pela ação e pela avaliação em lote."""
+        # 1. Extração local (regex + gazetteer de especialidades/médicos), sem custo de LLM
+        local = extract_entities(user_message, gazetteer)
+        extracted_data = dict(local.slots)
+        logger.debug(f"Extração local: {extracted_data} (confiança {local.score:.2f})")
+
+        # 2. O Gemini só é chamado para o que ficou faltando, e só se sobrou texto não explicado
+        missing = [entity for entity, slot in cls.GEMINI_ENTITY_SLOTS.items() if slot not in extracted_data]
+        if not missing or not local.needs_llm():
+            return Extraction(extracted_data, False, None)
+        if not llm_gateway.available:
+            return Extraction(extracted_data, False, "unavailable")
+
+        prompt = EXTRACT_INFO_PROMPT.build(entities=", ".join(missing), sentence=user_message)
+        response_text = None
         try:
-            response = gemini_model.generate_content(prompt)
-            cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-            extracted_data = json.loads(cleaned_response)
-
-            slots_to_set = []
-            if extracted_data.get("especialidade"):
-                slots_to_set.append(SlotSet("especialidade", extracted_data["especialidade"]))
-            if extracted_data.get("data_preferida"):
-                slots_to_set.append(SlotSet("data_preferida", extracted_data["data_preferida"]))
-            if extracted_data.get("nome_doutor"): # New: Set doctor_name if extracted
-                slots_to_set.append(SlotSet("doctor_name", extracted_data["nome_doutor"]))
-            if extracted_data.get("nome_paciente"): # New: Set nome_paciente if extracted
-                slots_to_set.append(SlotSet("nome_paciente", extracted_data["nome_paciente"]))
-            if extracted_data.get("email"): # New: Set email if extracted
-                slots_to_set.append(SlotSet("email", extracted_data["email"]))
-            
-            if slots_to_set:
-                dispatcher.utter_message(text="Entendi! Vamos iniciar o agendamento com essas informações.")
-                return slots_to_set + [FollowupAction("formulario_agendamento")]
-            else:
-                
-                return [FollowupAction("action_handle_general_question")]
+            response_text = await llm_gateway.generate(prompt, label="extract_info")
+            cleaned_response = response_text.strip().replace("```json", "").replace("```", "")
+            gemini_data = json.loads(cleaned_response)
+            for entity in missing:
+                if gemini_data.get(entity):
+                    extracted_data[cls.GEMINI_ENTITY_SLOTS[entity]] = gemini_data[entity]
         except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON do Gemini na extração: {e}. Resposta bruta: {response.text}")
-            dispatcher.utter_message(text="Desculpe, tive um problema ao processar as informações. Vamos tentar de outra forma.")
-            return [FollowupAction("formulario_agendamento")] # Fallback to form for clarity
+            logger.error(f"Erro ao decodificar JSON do Gemini na extração: {e}. Resposta bruta: {response_text}")
+            return Extraction(extracted_data, True, "invalid_json")
         except Exception as e:
             logger.error(f"Erro na extração com Gemini: {e}")
+            return Extraction(extracted_data, True, "error")
+        return Extraction(extracted_data, True, None)
+
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
+        user_message = tracker.latest_message.get('text')
+        extracted_data, _, error = await self.extract(user_message, await get_gazetteer())
+
+        if not extracted_data:
+            if error == "unavailable":
+                dispatcher.utter_message(text="Desculpe, estou com problemas técnicos. Vamos tentar de outra forma.")
+                return [FollowupAction("formulario_agendamento")]
+            if error == "invalid_json":
+                dispatcher.utter_message(text="Desculpe, tive um problema ao processar as informações. Vamos tentar de outra forma.")
+                return [FollowupAction("formulario_agendamento")] # Fallback to form for clarity
+
+        slots_to_set = [SlotSet(slot, value) for slot, value in extracted_data.items()]
+        if slots_to_set:
+            dispatcher.utter_message(text="Entendi! Vamos iniciar o agendamento com essas informações.")
+            return slots_to_set + [FollowupAction("formulario_agendamento")]
+        else:
             return [FollowupAction("action_handle_general_question")]
 
 
-def _run_db_service(args: List[str]) -> Any:
+async def _run_db_service(args: List[str]) -> Any:
     """Executa uma chamada de API para o serviço de banco de dados e retorna a resposta JSON."""
     if not args:
         logger.error("Nenhum argumento fornecido para _run_db_service")
         return None
 
-    action = args[0]
-    params = args[1:]
-    
-    get_endpoints = {
-        "getSpecialties": "/specialties",
-        "getDoctorsBySpecialty": f"/doctors/specialty/{params[0]}" if params else None,
-        "getAvailableSlotsByDoctorAndDate": f"/doctors/{params[0]}/available-slots?date={params[1]}" if len(params) > 1 else None,
-    }
-    
-    post_endpoints = {
-        "findOrCreatePatient": "/patients",
-        "createAppointment": "/appointments"
-    }
-
-    try:
-        if action in get_endpoints:
-            endpoint = get_endpoints[action]
-            if not endpoint:
-                raise ValueError(f"Parâmetros faltando para a ação GET: {action}")
-            
-            url = f"{DATABASE_API_URL}{endpoint}"
-            logger.debug(f"Chamando GET: {url}")
-            response = requests.get(url, timeout=10) # 10 segundos de timeout
-
-        elif action in post_endpoints:
-            endpoint = post_endpoints[action]
-            url = f"{DATABASE_API_URL}{endpoint}"
-            
-            # Converte os dados para o formato JSON correto
-            if action == "findOrCreatePatient":
-                payload = {"email": params[0], "name": params[1]}
-            elif action == "createAppointment":
-                # O parâmetro já vem como uma string JSON, então carregamos
-                payload = json.loads(params[0])
-            else:
-                payload = {}
-
-            logger.debug(f"Chamando POST: {url} com dados: {payload}")
-            response = requests.post(url, json=payload, timeout=10)
-
-        else:
-            logger.error(f"Ação desconhecida para a API: {action}")
-            return None
-
-        response.raise_for_status()  # Lança um erro para respostas 4xx/5xx
-        return response.json()
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Erro de rede ao chamar o serviço de DB: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        logger.error(f"Erro ao decodificar JSON da resposta da API: {e}. Resposta: {response.text}")
-        return None
-    except Exception as e:
-        logger.error(f"Um erro inesperado ocorreu em _run_db_service: {e}")
-        return None
+    return await get_async_db_client().call(args[0], *args[1:])
 
 class ActionBuscarEspecialidades(Action):
     def name(self) -> Text:
         return "action_buscar_especialidades"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
-        specialties = _run_db_service(["getSpecialties"])
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
+        specialties = await get_specialties()
         if specialties:
             message = "Temos as seguintes especialidades:"
             buttons = [{"title": s['name'], "payload": f'/informar_especialidade{{"especialidade":"{s["name"]}"}}'} for s in specialties]
@@ -197,23 +183,23 @@ class ActionAskDoctorId(Action):
     def name(self) -> Text:
         return "action_ask_doctor_id"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
         especialidade_nome = tracker.get_slot("especialidade")
         if not especialidade_nome:
             dispatcher.utter_message(text="Para qual especialidade seria a consulta?")
             return []
 
-        specialties = _run_db_service(["getSpecialties"])
+        specialties = await get_specialties()
         if not specialties:
             dispatcher.utter_message(text="Desculpe, estou com problemas para acessar nossas especialidades.")
             return [SlotSet("especialidade", None)]
 
-        selected_specialty = next((s for s in specialties if s['name'].lower() == especialidade_nome.lower()), None)
+        # A especialidade e os médicos ficam no contexto da conversa para as validações seguintes
+        selected_specialty, doctors = await get_specialty_doctors(tracker.sender_id, especialidade_nome)
         if not selected_specialty:
             dispatcher.utter_message(f"Não encontrei a especialidade '{especialidade_nome}'.")
             return [SlotSet("especialidade", None)]
 
-        doctors = _run_db_service(["getDoctorsBySpecialty", str(selected_specialty['id'])])
         if doctors:
             message = f"Para {especialidade_nome}, temos os seguintes especialistas. Qual deles você prefere?"
             buttons = [{"title": d['name'], "payload": f'/informar_doutor{{"doctor_id":"{d["id"]}", "doctor_name":"{d["name"]}"}}'} for d in doctors]
@@ -223,44 +209,57 @@ class ActionAskDoctorId(Action):
             dispatcher.utter_message(f"Não encontrei doutores para {especialidade_nome}. Gostaria de tentar outra especialidade?")
         return []
 
+def _booking_key(sender_id: Text, appointment_data: Dict[Text, Any]) -> Text:
+    """Chave de idempotência do agendamento: mesma conversa, paciente, médico e horário."""
+    raw = f"{sender_id}|{appointment_data['email']}|{appointment_data['doctorId']}|{appointment_data['dateTime']}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 class ActionAgendarConsulta(Action):
     def name(self) -> Text:
         return "action_agendar_consulta"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
-        patient = _run_db_service(["findOrCreatePatient", tracker.get_slot("email"), tracker.get_slot("nome_paciente")])
-        if not patient:
-            dispatcher.utter_message(response="utter_erro_agendamento")
-            return [AllSlotsReset()]
-
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
         data_preferida_str = tracker.get_slot("data_preferida") # Expected format: DD/MM/YYYY
         horario_escolhido = tracker.get_slot("horario_escolhido") # Expected format: HH:MM
 
         try:
-            # Parse the date (DD/MM/YYYY)
-            day, month, year_str = data_preferida_str.split('/')
-
-            current_year = datetime.now().year
-            parsed_date = datetime(int(year_str), int(month), int(day))
-            if parsed_date < datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                parsed_date = datetime(current_year + 1, int(month), int(day))
+            # Mesmo parser usado na validação do formulário (o slot já vem como DD/MM/YYYY)
+            parsed_date = parse_date_expression(data_preferida_str)
+            if parsed_date is None:
+                raise ValueError(f"data inválida: {data_preferida_str}")
 
             # Combine with chosen time
             hora, minuto = map(int, horario_escolhido.split(':'))
-            appointment_datetime = parsed_date.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+            appointment_datetime = datetime.combine(parsed_date.start, time(hora, minuto))
 
         except Exception as e:
             logger.error(f"Erro ao parsear data ou hora para agendamento: {e}")
             dispatcher.utter_message(response="utter_erro_agendamento")
             return [AllSlotsReset()]
 
+        # Paciente e consulta em uma única chamada; a chave torna seguro repetir o pedido
         appointment_data = {
-            "patientId": patient['id'],
+            "email": tracker.get_slot("email"),
+            "name": tracker.get_slot("nome_paciente"),
             "doctorId": int(tracker.get_slot("doctor_id")),
             "dateTime": appointment_datetime.isoformat() + "Z",
         }
-
-        final_appointment = _run_db_service(["createAppointment", json.dumps(appointment_data)])
+        appointment_data["idempotencyKey"] = _booking_key(tracker.sender_id, appointment_data)
+
+        final_appointment = await _run_db_service(["bookAppointment", json.dumps(appointment_data)])
+        # Com ou sem sucesso, o horário pode ter sido ocupado: nunca reaproveitar o cache dessa data
+        invalidate_slots(appointment_data["doctorId"], appointment_datetime.strftime("%Y-%m-%d"))
+
+        if final_appointment and final_appointment.get('code') == "SLOT_UNAVAILABLE":
+            # Outro paciente ficou com o horário: volta ao formulário para escolher outra data/horário
+            dispatcher.utter_message(text="Desculpe, esse horário acabou de ser ocupado. Vamos escolher outra data?")
+            return [
+                SlotSet("data_preferida", None),
+                SlotSet("horario_escolhido", None),
+                SlotSet("horarios_disponiveis", None),
+                FollowupAction("formulario_agendamento"),
+            ]
 
         if final_appointment and final_appointment.get('id'):
             dispatcher.utter_message(
@@ -279,22 +278,8 @@ class ActionAgendarConsulta(Action):
             return [AllSlotsReset()]
 
 
-WEEKDAY_MAP = {
-    "segunda": 0, "segunda-feira": 0,
-    "terça": 1, "terça-feira": 1,
-    "quarta": 2, "quarta-feira": 2,
-    "quinta": 3, "quinta-feira": 3,
-    "sexta": 4, "sexta-feira": 4,
-    "sábado": 5,
-    "domingo": 6,
-}
-
-def _find_next_weekday(start_date: datetime, target_weekday: int) -> datetime:
-    """Encontra a data da próxima ocorrência de um dia da semana."""
-    days_ahead = target_weekday - start_date.weekday()
-    if days_ahead < 0:
-        days_ahead += 7
-    return start_date + timedelta(days=days_ahead)
+# Quantos dias à frente procurar o primeiro horário livre quando o usuário aceita "Qualquer um"
+ANY_DOCTOR_SEARCH_DAYS = 7
 
 
 class ValidateFormularioAgendamento(FormValidationAction):
@@ -316,38 +301,8 @@ class ValidateFormularioAgendamento(FormValidationAction):
             dispatcher.utter_message(text="Desculpe, parece que não tenho horários para validar.")
             return {"horario_escolhido": None}
 
-        validated_horario = None
-
-        # 1. Tenta encontrar o horário exato (ex: "15:00")
-        for horario in horarios_disponiveis:
-            if horario in user_text:
-                validated_horario = horario
-                break
-
-        if not validated_horario:
-            # 2. Tenta encontrar números no texto (ex: "às 9h", "9 horas")
-            numeros_encontrados = re.findall(r'\d+', user_text)
-            if numeros_encontrados:
-                for num_str in numeros_encontrados:
-                    for horario in horarios_disponiveis:
-                        if horario.startswith(num_str.zfill(2)): # zfill(2) transforma '9' em '09'
-                            validated_horario = horario
-                            break
-                    if validated_horario:
-                        break
-
-        if not validated_horario:
-            # 3. Tenta encontrar por posição (ex: "o primeiro", "opção 2")
-            posicoes = {
-                "primeiro": 0, "primeira": 0, "1": 0,
-                "segundo": 1, "segunda": 1, "2": 1,
-                "terceiro": 2, "terceira": 2, "3": 2,
-            }
-            for palavra, index in posicoes.items():
-                if palavra in user_text:
-                    if len(horarios_disponiveis) > index:
-                        validated_horario = horarios_disponiveis[index]
-                        break
+        # Hora exata, hora cheia, posição ("o primeiro") ou período ("de manhã"), em uma única passada
+        validated_horario = resolve_slot(horarios_disponiveis, user_text)
 
         if validated_horario:
             # Apenas retorna o slot validado. O Rasa cuidará do resto.
@@ -370,56 +325,45 @@ class ValidateFormularioAgendamento(FormValidationAction):
         
         doctor_id = tracker.get_slot("doctor_id")
         doctor_name = tracker.get_slot("doctor_name")
-        user_input_date = slot_value.lower()
 
-        if not doctor_id or doctor_id == 'any':
+        if not doctor_id:
             dispatcher.utter_message(text="Por favor, selecione um médico primeiro.")
             return {"data_preferida": None}
 
-        today = datetime.now()
-        target_date = None
-
-        # Try to parse exact date first (DD/MM or DD/MM/YYYY)
-        match_date = re.match(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?', user_input_date)
-        if match_date:
-            day, month, year = match_date.groups()
-            try:
-                if year:
-                    year_int = int(year)
-                    if len(year) == 2: # Handle 2-digit year (e.g., 24 for 2024)
-                        year_int = 2000 + year_int if year_int < 50 else 1900 + year_int
-                    target_date = datetime(year_int, int(month), int(day))
-                else: # No year specified, assume current year
-                    target_date = datetime(today.year, int(month), int(day))
-                
-                # If date is in the past, try next year
-                if target_date < today.replace(hour=0, minute=0, second=0, microsecond=0):
-                    target_date = datetime(today.year + 1, int(month), int(day))
-            except ValueError:
-                pass # Continue to other parsing methods if invalid date
-
-        if not target_date: # If exact date parsing failed, try relative dates
-            if "hoje" in user_input_date:
-                target_date = today
-            elif "amanhã" in user_input_date:
-                target_date = today + timedelta(days=1)
-            else:
-                # Check for weekdays (e.g., "segunda", "terça")
-                for day_name, day_index in WEEKDAY_MAP.items():
-                    if day_name in user_input_date:
-                        target_date = _find_next_weekday(today, day_index)
-                        break
-        
-        if not target_date:
-            dispatcher.utter_message(text=f"Não entendi a data '{slot_value}'. Por favor, tente 'hoje', 'amanhã', 'DD/MM' ou um dia da semana como 'segunda'.")
+        date_range = parse_date_expression(str(slot_value))
+        if not date_range:
+            dispatcher.utter_message(text=f"Não entendi a data '{slot_value}'. Por favor, tente 'hoje', 'amanhã', 'DD/MM', 'dia 15', 'semana que vem' ou um dia da semana como 'segunda'.")
             return {"data_preferida": None}
 
         # Set time to midday to avoid timezone issues with start/end of day
-        target_date = target_date.replace(hour=12, minute=0, second=0, microsecond=0)
+        target_date = datetime.combine(date_range.start, time(12))
         date_iso = target_date.strftime("%Y-%m-%d")
 
+        if doctor_id == 'any':
+            return await self._validar_data_qualquer_medico(dispatcher, tracker, target_date, date_range.end)
+
+        # Datas em que o médico não atende são recusadas sem consultar o banco
+        dias_atendimento = await self._dias_de_atendimento(tracker, doctor_id)
+        if dias_atendimento is not None and not self._atende_no_intervalo(dias_atendimento, date_range):
+            if not dias_atendimento:
+                dispatcher.utter_message(text=f"Desculpe, o(a) Dr(a). {doctor_name} não tem agenda de atendimento cadastrada. Por favor, escolha outro médico.")
+            elif date_range.is_single:
+                dispatcher.utter_message(
+                    text=f"O(a) Dr(a). {doctor_name} não atende {DAY_NAMES_PLURAL[day_of_week(date_range.start)]} ({target_date.strftime('%d/%m/%Y')}). "
+                         f"Os dias de atendimento são: {format_days(dias_atendimento)}. Por favor, escolha outra data."
+                )
+            else:
+                dispatcher.utter_message(
+                    text=f"O(a) Dr(a). {doctor_name} não atende entre {date_range.start.strftime('%d/%m/%Y')} e {date_range.end.strftime('%d/%m/%Y')}. "
+                         f"Os dias de atendimento são: {format_days(dias_atendimento)}. Por favor, escolha outra data."
+                )
+            return {"data_preferida": None, "horarios_disponiveis": []}
+
+        if not date_range.is_single:
+            return await self._validar_intervalo(dispatcher, doctor_id, doctor_name, date_range)
+
         # Calls the service to fetch available slots
-        horarios_disponiveis = _run_db_service(["getAvailableSlotsByDoctorAndDate", str(doctor_id), date_iso])
+        horarios_disponiveis = await get_available_slots(doctor_id, date_iso)
         
         if horarios_disponiveis is None:
             dispatcher.utter_message(text="Desculpe, tive um problema ao verificar os horários. Tente novamente.")
@@ -435,39 +379,149 @@ class ValidateFormularioAgendamento(FormValidationAction):
             dispatcher.utter_message(text=f"Desculpe, o(a) Dr(a). {doctor_name} não tem horários livres no dia {target_date.strftime('%d/%m/%Y')}. Por favor, escolha outra data.")
             return {"data_preferida": None, "horarios_disponiveis": []}
 
+    async def _dias_de_atendimento(self, tracker: Tracker, doctor_id: Text) -> Optional[List[int]]:
+        """Dias da semana em que o médico atende, pelo contexto da conversa; None se não for possível saber."""
+        context = conversation_contexts.get(tracker.sender_id)
+        dias = context.working_days(doctor_id)
+        especialidade_nome = tracker.get_slot("especialidade")
+        if dias is None and especialidade_nome and context.doctors is None:
+            # Contexto expirado ou perdido: recarrega os médicos (normalmente do cache de referência)
+            await get_specialty_doctors(tracker.sender_id, especialidade_nome)
+            dias = context.working_days(doctor_id)
+        return dias
+
+    @staticmethod
+    def _atende_no_intervalo(dias_atendimento: List[int], date_range: DateRange) -> bool:
+        dias = set(dias_atendimento)
+        total = (date_range.end - date_range.start).days + 1
+        return any(day_of_week(date_range.start + timedelta(days=n)) in dias for n in range(min(total, 7)))
+
+    async def _validar_intervalo(
+        self,
+        dispatcher: CollectingDispatcher,
+        doctor_id: Text,
+        doctor_name: Text,
+        date_range: DateRange,
+    ) -> Dict[Text, Any]:
+        """Para intervalos ("semana que vem"): oferece o primeiro dia do intervalo com horários livres."""
+        entries = await get_available_slots_batch(
+            date_range.start.isoformat(), date_range.end.isoformat(), doctor_ids=[doctor_id]
+        )
+        if entries is None:
+            dispatcher.utter_message(text="Desculpe, tive um problema ao verificar os horários. Tente novamente.")
+            return {"data_preferida": None}
+
+        escolhido = first_available(entries)
+        if not escolhido:
+            dispatcher.utter_message(
+                text=f"Desculpe, o(a) Dr(a). {doctor_name} não tem horários livres entre {date_range.start.strftime('%d/%m/%Y')} e {date_range.end.strftime('%d/%m/%Y')}. Por favor, escolha outra data."
+            )
+            return {"data_preferida": None, "horarios_disponiveis": []}
+
+        data_escolhida = datetime.strptime(escolhido['date'], "%Y-%m-%d").strftime('%d/%m/%Y')
+        horarios_disponiveis = escolhido['slots']
+        horarios_str = ", ".join(horarios_disponiveis)
+        message = f"Ótimo! O primeiro dia com horários livres para o(a) Dr(a). {doctor_name} é {data_escolhida}: {horarios_str}"
+        buttons = [{"title": h, "payload": f'/informar_horario_escolhido{{"horario_escolhido":"{h}"}}'} for h in horarios_disponiveis]
+        dispatcher.utter_message(text=message, buttons=buttons)
+        return {"data_preferida": data_escolhida, "horarios_disponiveis": horarios_disponiveis}
+
+    async def _validar_data_qualquer_medico(
+        self,
+        dispatcher: CollectingDispatcher,
+        tracker: Tracker,
+        target_date: datetime,
+        range_end: Optional[date] = None,
+    ) -> Dict[Text, Any]:
+        """Para "Qualquer um": busca em uma única chamada os horários de todos os médicos da especialidade.
+
+        Com um intervalo (``range_end`` depois de ``target_date``), aceita qualquer dia dentro dele.
+        """
+        especialidade_nome = tracker.get_slot("especialidade")
+        specialty = None
+        if especialidade_nome:
+            specialty, _ = await get_specialty_doctors(tracker.sender_id, especialidade_nome)
+        if not specialty:
+            dispatcher.utter_message(text="Por favor, selecione uma especialidade primeiro.")
+            return {"data_preferida": None}
+
+        date_iso = target_date.strftime("%Y-%m-%d")
+        range_iso = range_end.isoformat() if range_end else date_iso
+        date_to = max(range_iso, (target_date + timedelta(days=ANY_DOCTOR_SEARCH_DAYS - 1)).strftime("%Y-%m-%d"))
+        entries = await get_available_slots_batch(date_iso, date_to, specialty_id=specialty['id'])
+
+        if entries is None:
+            dispatcher.utter_message(text="Desculpe, tive um problema ao verificar os horários. Tente novamente.")
+            return {"data_preferida": None}
+
+        # Prefere o médico com o horário mais cedo na data (ou intervalo) pedida
+        escolhido = first_available([e for e in entries if date_iso <= e['date'] <= range_iso])
+        if escolhido:
+            data_escolhida = datetime.strptime(escolhido['date'], "%Y-%m-%d").strftime('%d/%m/%Y')
+            horarios_disponiveis = escolhido['slots']
+            horarios_str = ", ".join(horarios_disponiveis)
+            message = f"Ótimo! Encontrei os seguintes horários para o(a) Dr(a). {escolhido['doctorName']} no dia {data_escolhida}: {horarios_str}"
+            buttons = [{"title": h, "payload": f'/informar_horario_escolhido{{"horario_escolhido":"{h}"}}'} for h in horarios_disponiveis]
+            dispatcher.utter_message(text=message, buttons=buttons)
+            return {
+                "doctor_id": str(escolhido['doctorId']),
+                "doctor_name": escolhido['doctorName'],
+                "data_preferida": data_escolhida,
+                "horarios_disponiveis": horarios_disponiveis,
+            }
+
+        proximo = first_available(entries)
+        if proximo:
+            proxima_data = datetime.strptime(proximo['date'], "%Y-%m-%d").strftime('%d/%m/%Y')
+            dispatcher.utter_message(
+                text=f"Nenhum médico de {especialidade_nome} tem horários livres no dia {target_date.strftime('%d/%m/%Y')}. "
+                     f"O primeiro horário disponível é {proxima_data} às {proximo['slots'][0]} com o(a) Dr(a). {proximo['doctorName']}. Por favor, escolha outra data."
+            )
+        else:
+            dispatcher.utter_message(text=f"Desculpe, não há horários livres para {especialidade_nome} nos próximos {ANY_DOCTOR_SEARCH_DAYS} dias. Por favor, escolha outra data.")
+        return {"data_preferida": None, "horarios_disponiveis": []}
+
+
 class ActionLerPdfEResponder(Action):
     def name(self) -> Text:
         return "action_ler_pdf_e_responder"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
-        caminho_pdf = "data/material.pdf"  # ajuste para o caminho real do seu PDF
-
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict) -> List[Dict]:
         try:
-            with fitz.open(caminho_pdf) as doc:
-                texto = ""
-                for pagina in doc:
-                    texto += pagina.get_text()
-
             pergunta_usuario = tracker.latest_message.get("text")
 
-            if not gemini_model:
+            if not llm_gateway.available:
                 dispatcher.utter_message(text="Desculpe, estou com problemas técnicos para processar sua pergunta.")
                 return []
 
-            prompt = f"""
-            Você é um assistente da Clínica Super Saudável. Responda à pergunta do usuário com base no conteúdo a seguir, retirado de um material PDF:
+            # A busca pode precisar (re)extrair o PDF, que é bloqueante, então roda fora do event loop
+            loop = asyncio.get_running_loop()
+            # copy_context leva o span da conversa atual para a thread do executor
+            trechos = await loop.run_in_executor(
+                None, contextvars.copy_context().run, get_knowledge_base().search, pergunta_usuario
+            )
+            if not trechos:
+                dispatcher.utter_message(text="Não encontrei essa informação no material da clínica.")
+                return []
 
-            --- CONTEÚDO DO MATERIAL ---
-            {texto}
-            --- FIM DO MATERIAL ---
+            # Os trechos vêm em ordem de relevância e entram no prompt enquanto couberem no orçamento
+            prompt = PDF_QUESTION_PROMPT.build(
+                context=[f"[Página {t['page']}] {t['text']}" for t in trechos], question=pergunta_usuario
+            )
+            if prompt.context_dropped:
+                logger.debug(f"{prompt.context_dropped} trecho(s) do material ficaram fora do orçamento do prompt")
 
-            Pergunta: "{pergunta_usuario}"
-            Resposta:
-            """
+            if should_stream(tracker):
+                stream_id = start_stream(llm_gateway.stream(prompt, label="pdf_question"))
+                dispatcher.utter_message(json_message=stream_message(stream_id))
+                return []
 
-            resposta = gemini_model.generate_content(prompt)
-            dispatcher.utter_message(text=resposta.text)
+            resposta = await llm_gateway.generate(prompt, label="pdf_question")
+            dispatcher.utter_message(text=resposta)
 
+        except LLMUnavailableError as e:
+            logger.warning(f"LLM indisponível para a pergunta sobre o material: {e}")
+            dispatcher.utter_message(response="utter_default")
         except Exception as e:
             logger.error(f"Erro ao processar o PDF: {e}")
             dispatcher.utter_message(text="Desculpe, houve um erro ao acessar o material.")
@@ -0,0 +1,100 @@
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Text
+
+from actions.cache import create_cache
+from actions.db_client import get_async_db_client
+
+
+logger = logging.getLogger(__name__)
+
+# TTL curto: evita repetir a consulta quando o usuário alterna entre as mesmas datas,
+# sem deixar um horário recém-ocupado visível por muito tempo
+SLOTS_CACHE_TTL = float(os.getenv("SLOTS_CACHE_TTL", "30"))
+
+slots_cache = create_cache("slots", ttl=SLOTS_CACHE_TTL, maxsize=2048)
+
+# Geração de cada (médico, data), incrementada a cada invalidação: uma consulta que começou
+# antes de um agendamento não grava no cache a lista de horários de antes dele
+_generations: Dict[tuple, int] = {}
+# Acima disso, as gerações de datas passadas são descartadas
+_MAX_GENERATIONS = 4096
+
+
+def _slots_key(doctor_id: Any, date_iso: Text) -> tuple:
+    return ("slots", str(doctor_id), date_iso)
+
+
+async def get_available_slots(doctor_id: Any, date_iso: Text) -> Optional[List[Text]]:
+    """Horários livres de um médico em uma data (YYYY-MM-DD), com cache de curta duração."""
+    key = _slots_key(doctor_id, date_iso)
+    slots = slots_cache.get(key)
+    if slots is not None:
+        return slots
+
+    generation = _generations.get(key, 0)
+    slots = await get_async_db_client().call("getAvailableSlotsByDoctorAndDate", str(doctor_id), date_iso)
+    if slots is not None and _generations.get(key, 0) == generation:
+        slots_cache.set(key, slots)
+    return slots
+
+
+async def get_available_slots_batch(
+    date_from: Text,
+    date_to: Text,
+    specialty_id: Optional[Any] = None,
+    doctor_ids: Optional[List[Any]] = None,
+) -> Optional[List[Dict[Text, Any]]]:
+    """Horários livres de vários médicos (de uma especialidade ou lista de ids) em um intervalo de datas.
+
+    Retorna uma entrada {doctorId, doctorName, date, slots} por médico/dia, e aproveita a
+    resposta para preencher o cache por (médico, data) usado por get_available_slots.
+    """
+    generations = dict(_generations)
+    if specialty_id is not None:
+        entries = await get_async_db_client().call(
+            "getAvailableSlotsBySpecialtyAndRange", str(specialty_id), date_from, date_to
+        )
+    elif doctor_ids:
+        entries = await get_async_db_client().call(
+            "getAvailableSlotsByDoctorsAndRange", ",".join(str(d) for d in doctor_ids), date_from, date_to
+        )
+    else:
+        logger.error("get_available_slots_batch precisa de specialty_id ou doctor_ids")
+        return None
+
+    if entries is None:
+        return None
+
+    for entry in entries:
+        key = _slots_key(entry["doctorId"], entry["date"])
+        if _generations.get(key, 0) == generations.get(key, 0):
+            slots_cache.set(key, entry["slots"])
+    return entries
+
+
+def first_available(entries: List[Dict[Text, Any]]) -> Optional[Dict[Text, Any]]:
+    """Entrada com o horário livre mais cedo (data e hora), ou None se não houver nenhum."""
+    with_slots = [e for e in entries if e["slots"]]
+    if not with_slots:
+        return None
+    return min(with_slots, key=lambda e: (e["date"], e["slots"][0]))
+
+
+def invalidate_slots(doctor_id: Any, date_iso: Text) -> None:
+    """Descarta os horários em cache de um médico/data, ex.: logo após um agendamento."""
+    logger.debug(f"Invalidando horários em cache para médico {doctor_id} em {date_iso}")
+    key = _slots_key(doctor_id, date_iso)
+    _generations[key] = _generations.get(key, 0) + 1
+    if len(_generations) > _MAX_GENERATIONS:
+        today = date.today().isoformat()
+        for old_key in [k for k in _generations if k[2] < today]:
+            del _generations[old_key]
+    slots_cache.invalidate(key)
+    # Leituras novas não devem esperar uma consulta que começou antes do agendamento
+    get_async_db_client().forget("getAvailableSlotsByDoctorAndDate", str(doctor_id), date_iso)
+
+
+def slots_cache_stats() -> Dict[Text, Any]:
+    return slots_cache.stats()
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Text, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+# "memory": cada processo tem seus caches; "sqlite": os workers do servidor compartilham um arquivo
+ACTIONS_CACHE_BACKEND = os.getenv("ACTIONS_CACHE_BACKEND", "memory")
+ACTIONS_CACHE_PATH = os.getenv("ACTIONS_CACHE_PATH", os.path.join(tempfile.gettempdir(), "rasa_actions_cache.sqlite"))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache em memória com expiração (TTL), limite de tamanho (LRU) e contadores de acerto."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[Text, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class SqliteCache:
+    """Mesma interface do TTLCache, guardada em um arquivo SQLite compartilhado pelos processos.
+
+    Chaves e valores são serializados em JSON (tuplas voltam como listas); cada cache usa
+    um namespace próprio no arquivo. A conexão é aberta no primeiro uso em cada processo,
+    pois não pode atravessar um fork.
+    """
+
+    def __init__(self, path: Text, namespace: Text, ttl: float, maxsize: int = 1024) -> None:
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # WAL: leitores de outros processos não esperam pelas escritas
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (self.namespace, json.dumps(key), time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao ler o cache compartilhado {self.namespace}: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, json.dumps(key), json.dumps(value), expires_at),
+                )
+                self._writes += 1
+                # Expirados e excesso (os que vencem primeiro) são removidos a cada 100 escritas
+                if self._writes % 100 == 0:
+                    self._prune(conn, now)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar no cache compartilhado {self.namespace}: {e}")
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+        cursor = conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+            " SELECT key FROM cache WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.maxsize),
+        )
+        self.evictions += cursor.rowcount
+
+    def _execute(self, sql: Text, params: Tuple[Any, ...]) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(sql, params)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao alterar o cache compartilhado {self.namespace}: {e}")
+
+    def invalidate(self, key: Hashable) -> None:
+        self._execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, json.dumps(key)))
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ? AND expires_at > ?", (self.namespace, time.time())
+            ).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[Text, Any]:
+        total = self.hits + self.misses
+        try:
+            size = len(self)
+        except sqlite3.Error:
+            size = -1
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "backend": "sqlite",
+        }
+
+
+def shared_cache_path() -> Optional[Text]:
+    """Arquivo SQLite compartilhado pelos workers, ou None com o backend em memória."""
+    return ACTIONS_CACHE_PATH if ACTIONS_CACHE_BACKEND == "sqlite" else None
+
+
+def create_cache(namespace: Text, ttl: float, maxsize: int = 1024) -> Union[TTLCache, SqliteCache]:
+    """Cache no backend configurado (ACTIONS_CACHE_BACKEND); os valores precisam ser serializáveis em JSON no sqlite."""
+    path = shared_cache_path()
+    if path:
+        return SqliteCache(path, namespace, ttl=ttl, maxsize=maxsize)
+    return TTLCache(ttl=ttl, maxsize=maxsize)
@@ -0,0 +1,110 @@
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+from actions.cache import TTLCache
+from actions.reference_data import find_specialty, get_doctors_by_specialty, normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+# Uma conversa parada por mais que isso perde o contexto (e volta a consultar o banco se retomar)
+CONVERSATION_CONTEXT_TTL = float(os.getenv("CONVERSATION_CONTEXT_TTL", "1800"))
+CONVERSATION_CONTEXT_MAX = int(os.getenv("CONVERSATION_CONTEXT_MAX", "5000"))
+
+# Mesma numeração do DoctorAvailability.dayOfWeek (getUTCDay): 0 = domingo
+DAY_NAMES = ("domingo", "segunda", "terça", "quarta", "quinta", "sexta", "sábado")
+DAY_NAMES_PLURAL = ("aos domingos", "às segundas", "às terças", "às quartas", "às quintas", "às sextas", "aos sábados")
+
+
+def day_of_week(day: date) -> int:
+    return (day.weekday() + 1) % 7
+
+
+def format_days(days: List[int]) -> Text:
+    """Ex.: [1, 3, 5] -> "segunda, quarta e sexta"."""
+    names = [DAY_NAMES[d] for d in days]
+    return names[0] if len(names) == 1 else f"{', '.join(names[:-1])} e {names[-1]}"
+
+
+class ConversationContext:
+    """O que uma conversa já resolveu no formulário: especialidade, médicos e a agenda semanal de cada um."""
+
+    __slots__ = ("specialty", "doctors", "availability")
+
+    def __init__(self) -> None:
+        self.specialty: Optional[Dict[Text, Any]] = None
+        self.doctors: Optional[List[Dict[Text, Any]]] = None
+        # id do médico -> {dia da semana: (início, fim)}
+        self.availability: Dict[Text, Dict[int, Tuple[Text, Text]]] = {}
+
+    def set_doctors(self, specialty: Dict[Text, Any], doctors: List[Dict[Text, Any]]) -> None:
+        self.specialty = specialty
+        self.doctors = doctors
+        self.availability = {
+            str(d["id"]): {a["dayOfWeek"]: (a["startTime"], a["endTime"]) for a in d["availability"]}
+            for d in doctors
+            if "availability" in d
+        }
+
+    def has_specialty(self, name: Text) -> bool:
+        return self.specialty is not None and normalize_text(self.specialty["name"]) == normalize_text(name)
+
+    def working_days(self, doctor_id: Any) -> Optional[List[int]]:
+        """Dias da semana em que o médico atende, ou None se a agenda dele não é conhecida."""
+        weekly = self.availability.get(str(doctor_id))
+        return sorted(weekly) if weekly is not None else None
+
+    def works_on(self, doctor_id: Any, day: date) -> Optional[bool]:
+        """Se o médico atende nesse dia da semana; None quando não dá para saber sem o banco."""
+        weekly = self.availability.get(str(doctor_id))
+        if weekly is None:
+            return None
+        return day_of_week(day) in weekly
+
+
+class ConversationContextStore:
+    """Contextos por sender_id, com limite de tamanho (LRU) e expiração por inatividade.
+
+    Fica sempre na memória do processo: com vários workers, uma conversa que cai em outro
+    worker só recarrega os médicos, normalmente do cache de referência compartilhado.
+    """
+
+    def __init__(self, ttl: float = CONVERSATION_CONTEXT_TTL, maxsize: int = CONVERSATION_CONTEXT_MAX) -> None:
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    def get(self, sender_id: Text) -> ConversationContext:
+        context = self._cache.get(sender_id)
+        if context is None:
+            context = ConversationContext()
+        # Regravar a cada acesso renova o prazo: só expira o que ficou parado
+        self._cache.set(sender_id, context)
+        return context
+
+    def stats(self) -> Dict[Text, Any]:
+        return self._cache.stats()
+
+
+conversation_contexts = ConversationContextStore()
+
+
+async def get_specialty_doctors(
+    sender_id: Text, specialty_name: Text
+) -> Tuple[Optional[Dict[Text, Any]], Optional[List[Dict[Text, Any]]]]:
+    """Especialidade e médicos da conversa, consultando o banco só na primeira vez (ou se a especialidade mudou)."""
+    context = conversation_contexts.get(sender_id)
+    if context.doctors is not None and context.has_specialty(specialty_name):
+        return context.specialty, context.doctors
+
+    specialty = await find_specialty(specialty_name)
+    if not specialty:
+        return None, None
+    doctors = await get_doctors_by_specialty(specialty["id"])
+    if doctors is not None:
+        context.set_doctors(specialty, doctors)
+    return specialty, doctors
+
+
+def conversation_context_stats() -> Dict[Text, Any]:
+    return conversation_contexts.stats()
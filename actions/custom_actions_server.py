@@ -1,98 +1,182 @@
-# import logging
-# import json
-# import fitz
-# import requests
-# from typing import Text, Dict, Any
-
-# from rasa_sdk.endpoint import ActionEndpoint
-# from rasa_sdk.executor import ActionExecutor
-# from rasa_sdk.interfaces import Action
-# from sanic import Sanic, response
-
-# from actions.actions import *
-
-# logger = logging.getLogger(__name__)
-
-# # URL do servidor Rasa (usando o nome do serviço do render.yaml)
-# # A porta padrão do Rasa é 5005
-# RASA_SERVER_URL = "http://chatbot-rasa-server:5005"
-
-# def create_action_app(action_package_name: Text) -> Sanic:
-#     """Cria o app Sanic do servidor de ações e adiciona o endpoint de upload."""
-
-#     # Cria o executor de ações padrão do Rasa
-#     executor = ActionExecutor()
-#     executor.register_package(action_package_name)
-
-#     # Cria o app Sanic
-#     app = Sanic("rasa_sdk", configure_logging=False)
-
-#     # Cria o endpoint de ações padrão do Rasa (/webhook)
-#     action_endpoint = ActionEndpoint(executor)
-#     app.add_route(action_endpoint.health, "/health", methods=["GET", "OPTIONS"])
-#     app.add_route(action_endpoint.webhook, "/webhook", methods=["POST", "OPTIONS"])
-
-#     @app.post("/upload-pdf")
-#     async def upload_pdf(request):
-#         """
-#         Recebe um PDF, extrai o texto e o envia para a NLU do Rasa para
-#         extrair entidades e disparar a ação de agendamento.
-#         """
-#         # O frontend deve enviar o `sender_id` para sabermos a qual conversa pertence
-#         sender_id = request.form.get("sender_id")
-#         if not sender_id:
-#             return response.json({"error": "O campo 'sender_id' é obrigatório."}, status=400)
-
-#         # Pega o arquivo PDF do request
-#         pdf_file = request.files.get("pdf")
-#         if not pdf_file:
-#             return response.json({"error": "Nenhum arquivo PDF enviado."}, status=400)
-
-#         try:
-#             # Extrai o texto do PDF usando PyMuPDF
-#             pdf_document = fitz.open(stream=pdf_file.body, filetype="pdf")
-#             extracted_text = ""
-#             for page in pdf_document:
-#                 extracted_text += page.get_text()
-
-#             logger.info(f"Texto extraído do PDF para sender_id '{sender_id}': {extracted_text[:300]}...")
-
-#             nlu_payload = {"text": extracted_text}
-#             nlu_response = requests.post(f"{RASA_SERVER_URL}/model/parse", json=nlu_payload)
-#             nlu_response.raise_for_status()
-#             nlu_data = nlu_response.json()
-
-#             logger.info(f"Resposta da NLU: {json.dumps(nlu_data, indent=2)}")
-
-#             intent_name = nlu_data.get("intent", {}).get("name")
-#             entities = nlu_data.get("entities", [])
-
-#             if not intent_name:
-#                 return response.json({"message": "Nenhuma intenção foi identificada no PDF."})
-
-#             trigger_payload = {
-#                 "name": intent_name,
-#                 "entities": {entity["entity"]: entity["value"] for entity in entities}
-#             }
-
-#             trigger_url = f"{RASA_SERVER_URL}/conversations/{sender_id}/trigger_intent"
-#             trigger_response = requests.post(trigger_url, json=trigger_payload)
-#             trigger_response.raise_for_status()
-
-#             return response.json({
-#                 "message": "PDF processado com sucesso. A ação correspondente foi disparada.",
-#                 "nlu_result": nlu_data
-#             })
-
-#         except Exception as e:
-#             logger.error(f"Erro ao processar o PDF: {e}")
-#             return response.json({"error": "Falha ao processar o arquivo PDF."}, status=500)
-
-#     return app
-
-# if __name__ == "__main__":
-#     app = create_action_app("actions")
-#     port = 5055
-
-#     logger.info(f"Servidor de ações customizadas iniciado em http://0.0.0.0:{port}")
-#     app.run(host="0.0.0.0", port=port)
\ No newline at end of file
+import json
+import logging
+import os
+from functools import partial
+from typing import Dict, Iterable, Text, Tuple
+
+from rasa_sdk.endpoint import create_app
+from sanic import Sanic, response
+
+from actions.availability import slots_cache_stats
+from actions.cache import shared_cache_path
+from actions.conversation_context import conversation_context_stats
+from actions.db_client import get_async_db_client
+from actions.ingestion import get_ingestion_service
+from actions.llm_cache import get_response_cache
+from actions.llm_gateway import get_llm_gateway
+from actions.metrics import metrics
+from actions.reference_data import reference_cache_stats
+from actions.streaming import LLM_STREAMING, stream_registry
+from actions.warmup import schedule_warm_up
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = int(os.getenv("ACTION_SERVER_PORT", "5055"))
+# Processos do servidor; com mais de um, use ACTIONS_CACHE_BACKEND=sqlite para compartilhar os caches
+ACTION_SERVER_WORKERS = int(os.getenv("ACTION_SERVER_WORKERS", "1"))
+
+
+def dependency_gauges() -> Iterable[Tuple[Text, Dict[Text, Text], float]]:
+    """Gauges lidos das estatísticas já mantidas pelos caches, pelo cliente do DB e pelo gateway do LLM."""
+    for cache, stats in (
+        ("reference", reference_cache_stats()),
+        ("slots", slots_cache_stats()),
+        ("conversation", conversation_context_stats()),
+        ("llm", get_response_cache().stats()),
+    ):
+        # Contadores somáveis entre processos e no tempo; a taxa de acerto é só um resumo deste processo
+        yield "actions_cache_hits_total", {"cache": cache}, stats["hits"]
+        yield "actions_cache_misses_total", {"cache": cache}, stats["misses"]
+        yield "actions_cache_evictions_total", {"cache": cache}, stats["evictions"]
+        yield "actions_cache_hit_rate", {"cache": cache}, stats["hit_rate"]
+
+    db_client = get_async_db_client()
+    db_stats = db_client.stats.snapshot()
+    yield "actions_db_max_in_flight", {}, db_stats["max_in_flight"]
+    yield "actions_db_saturated_calls_total", {}, db_stats["saturated_calls"]
+    yield "actions_db_coalesced_total", {}, db_client.flights.coalesced
+
+    llm_stats = get_llm_gateway().stats()
+    yield "actions_llm_queue_depth", {}, llm_stats["queue_depth"]
+    yield "actions_llm_rejected_total", {}, llm_stats["rejected"]
+    yield "actions_llm_breaker_open", {}, 0 if llm_stats["breaker"] == "closed" else 1
+    yield "actions_llm_coalesced_total", {}, get_response_cache().flights.coalesced
+    # Tamanho dos prompts e das respostas: o que mais pesa na latência e no custo do LLM
+    for label, totals in llm_stats["tokens"].items():
+        for kind in ("prompt", "output"):
+            yield "actions_llm_tokens_total", {"label": label, "type": kind}, totals[kind]
+        yield "actions_llm_calls_total", {"label": label}, totals["calls"]
+        yield "actions_llm_max_prompt_tokens", {"label": label}, totals["max_prompt"]
+
+
+def create_action_app(action_package_name: Text) -> Sanic:
+    """Cria o app Sanic do servidor de ações e adiciona o endpoint de upload."""
+
+    # App padrão do rasa_sdk, com /health, /actions e /webhook
+    app = create_app(action_package_name)
+    schedule_warm_up(app)
+
+    if metrics.enabled:
+        metrics.register_collector(dependency_gauges)
+
+        @app.middleware("request")
+        async def start_action_metrics(request):
+            # Cada chamada ao /webhook executa uma ação para uma conversa (sender_id)
+            if request.method == "POST" and request.path == "/webhook":
+                body = request.json or {}
+                request.ctx.action_metrics = metrics.begin_action(body.get("next_action", "unknown"), body.get("sender_id"))
+
+        @app.middleware("response")
+        async def finish_action_metrics(request, response):
+            handle = getattr(request.ctx, "action_metrics", None)
+            if handle is not None:
+                request.ctx.action_metrics = None
+                metrics.end_action(handle, ok=response is not None and response.status < 400)
+
+    @app.get("/metrics")
+    async def metrics_endpoint(request):
+        """Latência por ação e por dependência, erros e chamadas em andamento (formato Prometheus)."""
+        if not metrics.enabled:
+            return response.text("Métricas desativadas (ACTIONS_METRICS=false).\n", status=404)
+        return response.text(metrics.render(), content_type="text/plain; version=0.0.4")
+
+    @app.get("/metrics/traces/<sender_id>")
+    async def traces_endpoint(request, sender_id: Text):
+        """Spans das últimas ações executadas para uma conversa (requer ACTIONS_TRACING=true)."""
+        spans = metrics.spans(sender_id) if metrics.tracing else None
+        if spans is None:
+            return response.json({"error": "Nenhum trace para esta conversa."}, status=404)
+        return response.json({"sender_id": sender_id, "spans": spans})
+
+    @app.post("/upload-pdf")
+    async def upload_pdf(request):
+        """
+        Recebe um ou mais PDFs (campo "pdf") e agenda a ingestão no material da clínica.
+        Responde imediatamente com o id do job; a extração roda em segundo plano.
+        """
+        pdf_files = request.files.getlist("pdf") if request.files else None
+        if not pdf_files:
+            return response.json({"error": "Nenhum arquivo PDF enviado."}, status=400)
+
+        try:
+            job_id = get_ingestion_service().submit([(f.name, f.body) for f in pdf_files])
+        except OSError as e:
+            logger.error(f"Erro ao gravar os PDFs enviados: {e}")
+            return response.json({"error": "Falha ao receber os arquivos PDF."}, status=500)
+
+        return response.json(
+            {"job_id": job_id, "status_url": app.url_for("upload_status", job_id=job_id)},
+            status=202,
+        )
+
+    @app.get("/upload-pdf/<job_id>", name="upload_status")
+    async def upload_status(request, job_id: Text):
+        """Andamento de um job de ingestão."""
+        job = get_ingestion_service().status(job_id)
+        if not job:
+            return response.json({"error": "Job não encontrado."}, status=404)
+        return response.json(job)
+
+    @app.get("/stream/<stream_id>")
+    async def stream_answer(request, stream_id: Text):
+        """Entrega, via Server-Sent Events, os trechos de uma resposta do LLM conforme são gerados."""
+        stream = stream_registry.get(stream_id)
+        if not stream:
+            return response.json({"error": "Stream não encontrado."}, status=404)
+
+        sse = await request.respond(
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "Access-Control-Allow-Origin": "*"},
+        )
+        async for chunk in stream.iter_chunks():
+            await sse.send(f"data: {json.dumps({'text': chunk}, ensure_ascii=False)}\n\n")
+        if stream.error:
+            await sse.send("event: error\ndata: {}\n\n")
+        else:
+            await sse.send("event: end\ndata: {}\n\n")
+        await sse.eof()
+
+    return app
+
+
+def run_server(
+    action_package_name: Text = "actions",
+    host: Text = "0.0.0.0",
+    port: int = DEFAULT_PORT,
+    workers: int = ACTION_SERVER_WORKERS,
+) -> None:
+    """Sobe o servidor com ``workers`` processos, cada um com o seu app criado por ``create_action_app``."""
+    if workers > 1:
+        if not shared_cache_path():
+            logger.warning("Com vários workers e ACTIONS_CACHE_BACKEND=memory, cada processo terá seus próprios caches")
+        if LLM_STREAMING:
+            # Os streams ficam na memória do worker que gerou a resposta
+            logger.warning("LLM_STREAMING com vários workers exige que /stream/<id> chegue ao mesmo processo do /webhook")
+
+    logger.info(f"Servidor de ações customizadas iniciado em http://{host}:{port} com {workers} worker(s)")
+    try:
+        from sanic.worker.loader import AppLoader
+    except ImportError:
+        # Sanic 21.x: os workers são criados por fork a partir do app já montado
+        create_action_app(action_package_name).run(host=host, port=port, workers=workers)
+        return
+
+    # Sanic 22.9+: cada worker é um processo novo que monta o próprio app pela fábrica
+    loader = AppLoader(factory=partial(create_action_app, action_package_name))
+    app = loader.load()
+    app.prepare(host=host, port=port, workers=workers)
+    Sanic.serve(primary=app, app_loader=loader)
+
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,314 @@
+import calendar
+import re
+from functools import lru_cache
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Text, Tuple
+
+
+class DateRange(NamedTuple):
+    """Intervalo de datas (inclusivo); uma data simples tem ``start == end``."""
+
+    start: date
+    end: date
+
+    @property
+    def is_single(self) -> bool:
+        return self.start == self.end
+
+
+class DateMatch(NamedTuple):
+    """Expressão de data encontrada em um texto: o intervalo e a posição (início, fim) no texto."""
+
+    range: DateRange
+    span: Tuple[int, int]
+    text: Text
+
+
+class _Token(NamedTuple):
+    kind: Text  # "date", "num" ou "word"
+    value: Any
+    start: int
+    end: int
+
+
+# Datas numéricas (DD/MM, DD/MM/AA, DD-MM-AAAA), números e palavras ("-feira" colado fica de fora).
+# Com "." ou "-" só vale a data completa com o ano de 4 dígitos: "10.5" e "9-12" não são datas
+_TOKEN_RE = re.compile(
+    r"(?P<date>(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{4}|\d{2}))?"
+    r"|(?P<dday>\d{1,2})(?P<sep>[.-])(?P<dmonth>\d{1,2})(?P=sep)(?P<dyear>\d{4}))(?!\d)"
+    r"|(?P<num>\d+)"
+    r"|(?P<word>[^\W\d_]+)(?:-feira\b)?"
+)
+# Remove os acentos do português sem mudar o tamanho do texto, preservando as posições dos tokens
+_ACCENTS = str.maketrans("áàâãäéèêëíìîïóòôõöúùûüç", "aaaaaeeeeiiiiooooouuuuc")
+
+WEEKDAYS = {
+    "segunda": 0, "terca": 1, "quarta": 2, "quinta": 3, "sexta": 4, "sabado": 5, "domingo": 6,
+}
+MONTHS = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6, "julho": 7,
+    "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+    "jan": 1, "fev": 2, "abr": 4, "jun": 6, "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12,
+}
+NUMBER_WORDS = {
+    "um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3, "quatro": 4, "cinco": 5, "seis": 6,
+    "sete": 7, "oito": 8, "nove": 9, "dez": 10, "quinze": 15,
+}
+# "segunda opção", "terceira vez": aqui o dia da semana é um ordinal
+ORDINAL_NOUNS = frozenset({"opcao", "vez", "horario", "semana", "quinzena", "consulta", "alternativa"})
+
+# Categorias usadas nas regras, no lugar de palavras literais
+DATE, NUM, WEEKDAY, MONTH = "<data>", "<numero>", "<dia_semana>", "<mes>"
+
+
+def tokenize(text: Text) -> List[_Token]:
+    """Quebra o texto em tokens sem acentos, guardando a posição de cada um no texto original."""
+    text = text.lower()
+    if not text.isascii():
+        text = text.translate(_ACCENTS)
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "word":
+            tokens.append(_Token(kind, m.group(kind), m.start(), m.end()))
+        elif kind == "num":
+            tokens.append(_Token(kind, int(m.group(kind)), m.start(), m.end()))
+        else:
+            day, month, year = m.group("day", "month", "year")
+            if day is None:
+                day, month, year = m.group("dday", "dmonth", "dyear")
+            tokens.append(_Token("date", (int(day), int(month), year), m.start(), m.end()))
+    return tokens
+
+
+# Tabelas de cada categoria de palavra ("dez" é tanto número quanto mês)
+_WORD_CATEGORIES = {WEEKDAY: WEEKDAYS, MONTH: MONTHS, NUM: NUMBER_WORDS}
+
+
+def _category_value(token: _Token, category: Text) -> Optional[Any]:
+    """Valor do token na categoria pedida (data, número, dia da semana, mês), ou None."""
+    if token.kind == "date":
+        return token.value if category == DATE else None
+    if token.kind == "num":
+        return token.value if category == NUM else None
+    table = _WORD_CATEGORIES.get(category)
+    return table.get(token.value) if table else None
+
+
+def _categories(token: _Token) -> List[Text]:
+    if token.kind == "date":
+        return [DATE]
+    if token.kind == "num":
+        return [NUM]
+    return [category for category, table in _WORD_CATEGORIES.items() if token.value in table]
+
+
+# ---------------------------------------------------------------------------
+# Conversões de cada regra (sempre relativas a ``today``)
+
+
+def _single(day: date) -> DateRange:
+    return DateRange(day, day)
+
+
+def _explicit_date(today: date, parts: Tuple[int, int, Optional[Text]]) -> Optional[DateRange]:
+    day, month, year = parts
+    try:
+        if year:
+            year_int = int(year)
+            if len(year) == 2:  # 24 -> 2024, 99 -> 1999
+                year_int = 2000 + year_int if year_int < 50 else 1900 + year_int
+            target = date(year_int, month, day)
+        else:
+            target = date(today.year, month, day)
+        # Datas que já passaram são entendidas como do ano seguinte
+        if target < today:
+            target = date(today.year + 1, month, day)
+    except ValueError:
+        return None
+    return _single(target)
+
+
+def _offset(days: int) -> Callable[..., DateRange]:
+    return lambda today: _single(today + timedelta(days=days))
+
+
+def _in_days(today: date, amount: int) -> DateRange:
+    return _single(today + timedelta(days=amount))
+
+
+def _next_weekday(today: date, weekday: int, skip_today: bool = False) -> DateRange:
+    days_ahead = (weekday - today.weekday()) % 7
+    if days_ahead == 0 and skip_today:
+        days_ahead = 7
+    return _single(today + timedelta(days=days_ahead))
+
+
+def _day_of_month(today: date, day: int, month: Optional[int] = None) -> Optional[DateRange]:
+    """Próxima ocorrência do dia (no mês informado, ou no mês corrente/seguintes)."""
+    if not 1 <= day <= 31:
+        return None
+    year, current = today.year, month or today.month
+    for _ in range(13):
+        if day <= calendar.monthrange(year, current)[1]:
+            target = date(year, current, day)
+            if target >= today:
+                return _single(target)
+        if month:
+            year += 1
+        else:
+            current += 1
+            if current > 12:
+                year, current = year + 1, 1
+    return None
+
+
+def _this_week(today: date) -> DateRange:
+    return DateRange(today, today + timedelta(days=6 - today.weekday()))
+
+
+def _next_week(today: date) -> DateRange:
+    monday = today + timedelta(days=7 - today.weekday())
+    return DateRange(monday, monday + timedelta(days=6))
+
+
+def _weekend(today: date) -> DateRange:
+    if today.weekday() == 6:
+        return _single(today)
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+    return DateRange(saturday, saturday + timedelta(days=1))
+
+
+def _next_month(today: date) -> DateRange:
+    year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+    return DateRange(date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1]))
+
+
+def _words(phrase: Text) -> List[frozenset]:
+    return [frozenset(alternatives.split("|")) for alternatives in phrase.split()]
+
+
+# Cada regra: sequência de itens (palavras alternativas ou categoria) e a conversão para datas.
+# Os valores das categorias casadas são passados, em ordem, para a conversão.
+# Regras mais longas vêm antes, para "depois de amanhã" não ser lido como "amanhã".
+RULES: List[Tuple[List[Any], Callable[..., Optional[DateRange]]]] = [
+    ([DATE], _explicit_date),
+    (_words("depois de amanha"), _offset(2)),
+    (_words("hoje"), _offset(0)),
+    (_words("amanha"), _offset(1)),
+    (_words("daqui a") + [NUM] + _words("dia|dias"), _in_days),
+    (_words("em") + [NUM] + _words("dia|dias"), _in_days),
+    (_words("dia") + [NUM] + _words("de") + [MONTH], _day_of_month),
+    ([NUM] + _words("de") + [MONTH], _day_of_month),
+    (_words("dia") + [NUM], _day_of_month),
+    (_words("semana que vem"), _next_week),
+    (_words("proxima semana"), _next_week),
+    (_words("esta|essa|nesta|nessa semana"), _this_week),
+    (_words("fim|final de semana"), _weekend),
+    (_words("mes que vem"), _next_month),
+    (_words("proximo mes"), _next_month),
+    (_words("proxima|proximo") + [WEEKDAY] + _words("feira"), lambda today, wd: _next_weekday(today, wd, True)),
+    (_words("proxima|proximo") + [WEEKDAY], lambda today, wd: _next_weekday(today, wd, True)),
+    ([WEEKDAY] + _words("feira que vem"), lambda today, wd: _next_weekday(today, wd, True)),
+    ([WEEKDAY] + _words("que vem"), lambda today, wd: _next_weekday(today, wd, True)),
+    ([WEEKDAY] + _words("feira"), _next_weekday),
+    ([WEEKDAY], _next_weekday),
+]
+
+
+def _build_index(rules: List[Tuple[List[Any], Callable[..., Optional[DateRange]]]]) -> Dict[Any, List[Tuple[List[Any], Callable]]]:
+    """Indexa as regras pelo primeiro item, para só testar as que podem começar no token atual."""
+    index: Dict[Any, List[Tuple[List[Any], Callable]]] = {}
+    for pattern, convert in rules:
+        first = pattern[0]
+        keys = [first] if isinstance(first, str) else list(first)
+        for key in keys:
+            index.setdefault(key, []).append((pattern, convert))
+    return index
+
+
+_RULE_INDEX = _build_index(RULES)
+
+
+def _match_rule(pattern: List[Any], tokens: List[_Token], position: int) -> Optional[List[Any]]:
+    """Valores das categorias se o padrão casa a partir de ``position``; None caso contrário."""
+    if position + len(pattern) > len(tokens):
+        return None
+    values = []
+    for item, token in zip(pattern, tokens[position:]):
+        if isinstance(item, str):
+            value = _category_value(token, item)
+            if value is None:
+                return None
+            values.append(value)
+        elif token.kind != "word" or token.value not in item:
+            return None
+    return values
+
+
+def _is_ordinal(tokens: List[_Token], position: int) -> bool:
+    following = tokens[position + 1] if position + 1 < len(tokens) else None
+    return following is not None and following.kind == "word" and following.value in ORDINAL_NOUNS
+
+
+def _word_rules() -> Dict[Text, List[Tuple[List[Any], Callable]]]:
+    """Regras que podem começar em cada palavra conhecida, pela própria palavra ou por sua categoria."""
+    words = {key for key in _RULE_INDEX if not key.startswith("<")}
+    for table in _WORD_CATEGORIES.values():
+        words.update(table)
+    table = {}
+    for word in words:
+        token = _Token("word", word, 0, 0)
+        rules = list(_RULE_INDEX.get(word, []))
+        for category in _categories(token):
+            rules += _RULE_INDEX.get(category, [])
+        if rules:
+            table[word] = rules
+    return table
+
+
+_WORD_RULES = _word_rules()
+_DATE_RULES = _RULE_INDEX.get(DATE, [])
+_NUM_RULES = _RULE_INDEX.get(NUM, [])
+
+
+def _candidates(token: _Token) -> List[Tuple[List[Any], Callable]]:
+    if token.kind == "word":
+        return _WORD_RULES.get(token.value, [])
+    return _DATE_RULES if token.kind == "date" else _NUM_RULES
+
+
+def find_date_expression(text: Text, today: Optional[date] = None) -> Optional[DateMatch]:
+    """Primeira expressão de data reconhecida no texto, já convertida para um intervalo de datas."""
+    return _find_cached(text, today or date.today())
+
+
+# As mesmas poucas expressões ("amanhã", "sexta", o DD/MM/AAAA do botão) se repetem entre as
+# conversas; o resultado depende só do texto e do dia, então é guardado
+@lru_cache(maxsize=2048)
+def _find_cached(text: Text, today: date) -> Optional[DateMatch]:
+    return _find(text, today)
+
+
+def _find(text: Text, today: date) -> Optional[DateMatch]:
+    tokens = tokenize(text)
+    for position, token in enumerate(tokens):
+        for pattern, convert in _candidates(token):
+            values = _match_rule(pattern, tokens, position)
+            if values is None:
+                continue
+            if pattern[0] == WEEKDAY and _is_ordinal(tokens, position):
+                continue
+            date_range = convert(today, *values)
+            if date_range is None:
+                # Data inválida ("31/02", "dia 31 de abril"): não tenta uma regra mais curta no mesmo ponto
+                break
+            last = tokens[position + len(pattern) - 1]
+            return DateMatch(date_range, (token.start, last.end), text[token.start:last.end])
+    return None
+
+
+def parse_date_expression(text: Text, today: Optional[date] = None) -> Optional[DateRange]:
+    """Converte expressões como "15/03", "amanhã", "sexta", "dia 15" ou "semana que vem" em datas."""
+    match = find_date_expression(text, today)
+    return match.range if match else None
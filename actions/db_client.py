@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Text, Tuple
+from urllib.parse import urlencode
+
+from actions.metrics import track
+from actions.single_flight import SingleFlight
+
+# aiohttp é importado no primeiro uso do cliente, para não pesar no startup
+if TYPE_CHECKING:
+    import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+DATABASE_API_URL = os.getenv("DATABASE_API_URL", "http://localhost:3000")
+
+# Tamanho do pool de conexões keep-alive com a API do banco
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Tentativas extras (GETs e operações com chave de idempotência) e fator de backoff exponencial
+DB_MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "2"))
+DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "0.2"))
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+# GETs idênticos simultâneos compartilham uma única chamada à API (cliente assíncrono)
+DB_COALESCE = os.getenv("DB_COALESCE", "true").lower() in ("1", "true", "yes")
+
+# Timeout de leitura (segundos) por operação; pode ser sobrescrito com DB_TIMEOUT_<OPERACAO>
+ENDPOINT_TIMEOUTS: Dict[Text, float] = {
+    "getSpecialties": 5,
+    "getDoctorsBySpecialty": 5,
+    "getAvailableSlotsByDoctorAndDate": 10,
+    "getAvailableSlotsBySpecialtyAndRange": 15,
+    "getAvailableSlotsByDoctorsAndRange": 15,
+    "findOrCreatePatient": 10,
+    "createAppointment": 10,
+    "bookAppointment": 10,
+}
+DEFAULT_TIMEOUT = 10
+
+RETRY_STATUS_CODES = (502, 503, 504)
+# POSTs que podem ser repetidos com segurança: a API deduplica pela idempotencyKey do payload
+IDEMPOTENT_OPERATIONS = frozenset({"bookAppointment"})
+# Respostas de erro esperadas, cujo corpo JSON é devolvido ao chamador em vez de None
+EXPECTED_ERROR_STATUSES: Dict[Text, Tuple[int, ...]] = {
+    "bookAppointment": (409,),
+}
+LATENCY_SAMPLES = 500
+
+
+def _timeout_for(action: Text) -> float:
+    override = os.getenv(f"DB_TIMEOUT_{action.upper()}")
+    if override:
+        return float(override)
+    return ENDPOINT_TIMEOUTS.get(action, DEFAULT_TIMEOUT)
+
+
+def _resolve_request(action: Text, params: List[Any]) -> Tuple[Text, Text, Optional[Dict[Text, Any]]]:
+    """Traduz uma operação do serviço de DB em (método, caminho, payload)."""
+    get_endpoints = {
+        "getSpecialties": "/specialties",
+        "getDoctorsBySpecialty": f"/doctors/specialty/{params[0]}" if params else None,
+        "getAvailableSlotsByDoctorAndDate": f"/doctors/{params[0]}/available-slots?date={params[1]}" if len(params) > 1 else None,
+        # Vários médicos e/ou várias datas em uma única chamada: (especialidade | ids separados por vírgula, de, até)
+        "getAvailableSlotsBySpecialtyAndRange": "/available-slots?" + urlencode({"specialtyId": params[0], "from": params[1], "to": params[2]}) if len(params) > 2 else None,
+        "getAvailableSlotsByDoctorsAndRange": "/available-slots?" + urlencode({"doctorIds": params[0], "from": params[1], "to": params[2]}) if len(params) > 2 else None,
+    }
+
+    post_endpoints = {
+        "findOrCreatePatient": "/patients",
+        "createAppointment": "/appointments",
+        # Paciente + agendamento em uma única chamada, com idempotencyKey
+        "bookAppointment": "/bookings",
+    }
+
+    if action in get_endpoints:
+        endpoint = get_endpoints[action]
+        if not endpoint:
+            raise ValueError(f"Parâmetros faltando para a ação GET: {action}")
+        return "GET", endpoint, None
+
+    if action in post_endpoints:
+        # Converte os dados para o formato JSON correto
+        if action == "findOrCreatePatient":
+            payload = {"email": params[0], "name": params[1]}
+        elif action in ("createAppointment", "bookAppointment"):
+            # O parâmetro já vem como uma string JSON, então carregamos
+            payload = json.loads(params[0])
+        else:
+            payload = {}
+        return "POST", post_endpoints[action], payload
+
+    raise KeyError(action)
+
+
+class DbClientStats:
+    """Métricas do cliente: latência por operação e saturação do pool."""
+
+    def __init__(self, pool_size: int) -> None:
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.saturated_calls = 0
+        self.errors: Dict[Text, int] = {}
+        self._latencies: Dict[Text, Deque[float]] = {}
+        self._calls: Dict[Text, int] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            if self.in_flight >= self.pool_size:
+                self.saturated_calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish(self, action: Text, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._calls[action] = self._calls.get(action, 0) + 1
+            self._latencies.setdefault(action, deque(maxlen=LATENCY_SAMPLES)).append(elapsed)
+            if not ok:
+                self.errors[action] = self.errors.get(action, 0) + 1
+
+    def snapshot(self) -> Dict[Text, Any]:
+        with self._lock:
+            latencies = {}
+            for action, samples in self._latencies.items():
+                ordered = sorted(samples)
+                latencies[action] = {
+                    "calls": self._calls[action],
+                    "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2),
+                }
+            return {
+                "pool_size": self.pool_size,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "saturated_calls": self.saturated_calls,
+                "errors": dict(self.errors),
+                "latency": latencies,
+            }
+
+
+class AsyncDbServiceClient:
+    """Cliente HTTP com pool de conexões keep-alive para o serviço de banco de dados.
+
+    É assíncrono (aiohttp), para não bloquear o event loop do servidor de ações.
+    """
+
+    def __init__(
+        self,
+        base_url: Text = DATABASE_API_URL,
+        pool_size: int = DB_POOL_SIZE,
+        max_retries: int = DB_MAX_RETRIES,
+        backoff_factor: float = DB_RETRY_BACKOFF,
+        coalesce: bool = DB_COALESCE,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.stats = DbClientStats(pool_size)
+        self.coalesce = coalesce
+        self.flights = SingleFlight()
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        # A sessão precisa ser criada dentro do event loop em execução
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _request(self, method: Text, url: Text, payload: Optional[Dict[Text, Any]], action: Text) -> Any:
+        import aiohttp
+
+        timeout = aiohttp.ClientTimeout(connect=DB_CONNECT_TIMEOUT, sock_read=_timeout_for(action))
+        # Timeouts também são repetidos: GETs e operações idempotentes não têm efeito duplicado
+        attempts = 1 + (self.max_retries if method == "GET" or action in IDEMPOTENT_OPERATIONS else 0)
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                async with self._get_session().request(method, url, json=payload, timeout=timeout) as response:
+                    if response.status in RETRY_STATUS_CODES and not last_attempt:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    if response.status in EXPECTED_ERROR_STATUSES.get(action, ()):
+                        return await response.json(content_type=None)
+                    response.raise_for_status()  # Lança um erro para respostas 4xx/5xx
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUS_CODES
+                if last_attempt or not retryable:
+                    raise
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def call(self, action: Text, *params: Any) -> Any:
+        """Executa uma operação da API sem bloquear o event loop (None em caso de erro).
+
+        Leituras idênticas em andamento (ex.: vários usuários abrindo o agendamento ao mesmo
+        tempo) compartilham a mesma chamada e o mesmo resultado.
+        """
+        try:
+            method, endpoint, payload = _resolve_request(action, list(params))
+        except KeyError:
+            logger.error(f"Ação desconhecida para a API: {action}")
+            return None
+        except (ValueError, IndexError) as e:
+            logger.error(f"Parâmetros inválidos para {action}: {e}")
+            return None
+
+        url = f"{self.base_url}{endpoint}"
+        if method == "GET" and self.coalesce:
+            return await self.flights.do(url, lambda: self._call(action, method, url, payload))
+        return await self._call(action, method, url, payload)
+
+    def forget(self, action: Text, *params: Any) -> None:
+        """Faz a próxima leitura desta operação ir à API em vez de esperar uma chamada já em andamento."""
+        try:
+            _, endpoint, _ = _resolve_request(action, list(params))
+        except (KeyError, ValueError, IndexError):
+            return
+        self.flights.forget(f"{self.base_url}{endpoint}")
+
+    async def _call(self, action: Text, method: Text, url: Text, payload: Optional[Dict[Text, Any]]) -> Any:
+        import aiohttp
+
+        ok = False
+        self.stats.start()
+        start = time.perf_counter()
+        try:
+            logger.debug(f"Chamando {method}: {url} com dados: {payload}")
+            async with track("db", action):
+                result = await self._request(method, url, payload, action)
+            ok = True
+            return result
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao decodificar JSON da resposta da API: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Erro de rede ao chamar o serviço de DB: {e!r}")
+            return None
+        except Exception as e:
+            logger.error(f"Um erro inesperado ocorreu ao chamar o serviço de DB: {e}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.finish(action, elapsed, ok)
+            logger.debug(f"{action} levou {elapsed * 1000:.1f} ms (ok={ok})")
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+_async_client: Optional[AsyncDbServiceClient] = None
+
+
+def get_async_db_client() -> AsyncDbServiceClient:
+    """Retorna o cliente assíncrono compartilhado, criando-o no primeiro uso."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncDbServiceClient()
+    return _async_client
@@ -0,0 +1,195 @@
+import re
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+from actions.date_parser import find_date_expression
+from actions.knowledge_base import STOPWORDS
+from actions.reference_data import get_specialties, normalize_text
+
+
+# Confiança atribuída a cada tipo de achado local
+CONFIDENCE_EMAIL = 0.99
+CONFIDENCE_DATE = 0.95
+CONFIDENCE_GAZETTEER = 0.9
+CONFIDENCE_SYNONYM = 0.8
+CONFIDENCE_NAME_PATTERN = 0.75
+
+# Achados abaixo disso são descartados e ficam para o Gemini
+LOCAL_EXTRACTION_MIN_CONFIDENCE = 0.7
+# Quantas palavras "não explicadas" pela extração local justificam consultar o Gemini
+LLM_RESIDUAL_MIN_TOKENS = 3
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Só a frase que introduz o nome ignora maiúsculas; o nome em si precisa vir capitalizado.
+# "para Fulano" (ex.: "Agendar para ...") fica de fora: também introduz médicos e especialidades
+NAME_RE = re.compile(
+    r"\b(?i:meu nome(?: completo)?(?: [ée]|:)|me chamo|sou(?: [oa])?"
+    r"|(?:[oa] )?paciente(?: [ée]| se chama|:)|o nome(?: do paciente| para o agendamento)? [ée]"
+    r"|nome:|(?:em|no) nome de)\s+"
+    r"([A-ZÀ-Ý][a-zà-ÿ]+(?:\s+(?:d[aeo]s?\s+)?[A-ZÀ-Ý][a-zà-ÿ]+)*)"
+)
+_WORD_RE = re.compile(r"\w+")
+
+# Formas comuns de citar a especialidade que não derivam do nome cadastrado
+SPECIALTY_SYNONYMS = {
+    "pediatra": "Pediatria",
+    "clinico geral": "Clínica Geral",
+    "clinico": "Clínica Geral",
+}
+
+# Palavras típicas de um pedido de agendamento, que não indicam informação faltando
+FILLER_WORDS = STOPWORDS | frozenset(
+    "quero queria gostaria preciso marcar agendar consulta consultas horario dia dr dra doutor doutora "
+    "com pra por favor oi ola bom boa tarde noite obrigado obrigada email".split()
+)
+
+_END = "__fim__"
+
+
+def _words(text: Text) -> List[Text]:
+    return _WORD_RE.findall(normalize_text(text))
+
+
+class Gazetteer:
+    """Trie de palavras para encontrar nomes conhecidos (especialidades, médicos) em uma única passada."""
+
+    def __init__(self) -> None:
+        self._root: Dict[Text, Any] = {}
+
+    def add(self, phrase: Text, value: Any) -> None:
+        words = _words(phrase)
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        # A mesma forma apontando para valores diferentes é ambígua; não decide localmente
+        if _END in node and node[_END] != value:
+            node[_END] = None
+        else:
+            node[_END] = value
+
+    def find(self, words: List[Text]) -> List[Tuple[int, int, Any]]:
+        """Ocorrências (início, fim, valor) não sobrepostas, preferindo a mais longa em cada posição."""
+        matches = []
+        i = 0
+        while i < len(words):
+            node = self._root
+            best = None
+            j = i
+            while j < len(words) and words[j] in node:
+                node = node[words[j]]
+                j += 1
+                if _END in node and node[_END] is not None:
+                    best = (i, j, node[_END])
+            if best:
+                matches.append(best)
+                i = best[1]
+            else:
+                i += 1
+        return matches
+
+
+def build_gazetteer(specialties: List[Dict[Text, Any]]) -> Gazetteer:
+    """Monta o gazetteer a partir da lista de especialidades (com seus médicos) da API."""
+    gazetteer = Gazetteer()
+    for specialty in specialties:
+        name = specialty["name"]
+        entry = ("especialidade", CONFIDENCE_GAZETTEER, {"especialidade": name})
+        gazetteer.add(name, entry)
+        # "Cardiologia" -> "cardiologista", "Ortopedia" -> "ortopedista"
+        normalized = normalize_text(name)
+        if normalized.endswith("ia"):
+            gazetteer.add(normalized[:-2] + "ista", ("especialidade", CONFIDENCE_SYNONYM, {"especialidade": name}))
+
+        for doctor in specialty.get("doctors") or []:
+            slots = {"doctor_id": str(doctor["id"]), "doctor_name": doctor["name"], "especialidade": name}
+            doctor_entry = ("doctor", CONFIDENCE_GAZETTEER, slots)
+            words = _words(doctor["name"])
+            if words and words[0] in ("dr", "dra"):
+                words = words[1:]
+            if not words:
+                continue
+            full_name = " ".join(words)
+            gazetteer.add(full_name, doctor_entry)
+            for title in ("dr", "dra", "doutor", "doutora"):
+                gazetteer.add(f"{title} {full_name}", doctor_entry)
+                gazetteer.add(f"{title} {words[-1]}", ("doctor", CONFIDENCE_SYNONYM, slots))
+
+    for synonym, name in SPECIALTY_SYNONYMS.items():
+        if any(s["name"] == name for s in specialties):
+            gazetteer.add(synonym, ("especialidade", CONFIDENCE_SYNONYM, {"especialidade": name}))
+    return gazetteer
+
+
+# (especialidades usadas na construção, gazetteer); fica em cada processo, pois não é serializável
+_gazetteer: Optional[Tuple[List[Dict[Text, Any]], Gazetteer]] = None
+
+
+async def get_gazetteer() -> Optional[Gazetteer]:
+    """Gazetteer construído a partir das especialidades em cache (reconstruído quando elas mudam)."""
+    global _gazetteer
+    specialties = await get_specialties()
+    if specialties is None:
+        return None
+    if _gazetteer is None or _gazetteer[0] != specialties:
+        _gazetteer = (specialties, build_gazetteer(specialties))
+    return _gazetteer[1]
+
+
+class LocalExtraction:
+    """Resultado da extração local: valores por slot, confiança por slot e palavras não explicadas."""
+
+    def __init__(self) -> None:
+        self.slots: Dict[Text, Text] = {}
+        self.confidence: Dict[Text, float] = {}
+        self.residual_words: List[Text] = []
+
+    def add(self, values: Dict[Text, Text], confidence: float) -> None:
+        if confidence < LOCAL_EXTRACTION_MIN_CONFIDENCE:
+            return
+        for slot, value in values.items():
+            if slot not in self.slots or confidence > self.confidence[slot]:
+                self.slots[slot] = value
+                self.confidence[slot] = confidence
+
+    @property
+    def score(self) -> float:
+        """Confiança geral: a menor entre os slots preenchidos (0 se nada foi encontrado)."""
+        return min(self.confidence.values()) if self.confidence else 0.0
+
+    def needs_llm(self) -> bool:
+        return not self.slots or len(self.residual_words) >= LLM_RESIDUAL_MIN_TOKENS
+
+
+def extract_entities(text: Text, gazetteer: Optional[Gazetteer]) -> LocalExtraction:
+    """Extrai email, data, nome do paciente, especialidade e médico sem chamar o LLM."""
+    result = LocalExtraction()
+    remaining = text
+
+    email = EMAIL_RE.search(remaining)
+    if email:
+        result.add({"email": email.group(0)}, CONFIDENCE_EMAIL)
+        remaining = remaining.replace(email.group(0), " ")
+
+    # O texto da expressão vai para o slot; validate_data_preferida o converte com o mesmo parser
+    date = find_date_expression(remaining)
+    if date:
+        result.add({"data_preferida": date.text}, CONFIDENCE_DATE)
+        remaining = remaining[: date.span[0]] + " " + remaining[date.span[1]:]
+
+    name = NAME_RE.search(remaining)
+    if name:
+        result.add({"nome_paciente": name.group(1)}, CONFIDENCE_NAME_PATTERN)
+        remaining = remaining.replace(name.group(0), " ")
+
+    words = _words(remaining)
+    matched = set()
+    if gazetteer is not None:
+        for start, end, (_, confidence, values) in gazetteer.find(words):
+            result.add(values, confidence)
+            matched.update(range(start, end))
+
+    result.residual_words = [
+        w for i, w in enumerate(words) if i not in matched and w not in FILLER_WORDS and not w.isdigit()
+    ]
+    return result
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Callable, NamedTuple, Optional, Text
+
+from actions.prompts import estimate_tokens
+
+
+class FakeUsage(NamedTuple):
+    prompt_token_count: int
+    candidates_token_count: int
+
+
+class FakeResponse:
+    def __init__(self, text: Text, usage_metadata: Optional[FakeUsage] = None) -> None:
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeGenerativeModel:
+    """Substituto local do ``genai.GenerativeModel`` para testes e benchmarks, sem acesso à rede.
+
+    A latência e a taxa de falhas são configuráveis; a resposta pode ser fixa ou
+    calculada a partir do prompt. Os tokens informados são estimativas locais, com o preâmbulo
+    (system_instruction) somado à entrada.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        responder: Optional[Callable[[Text], Text]] = None,
+        system_instruction: Optional[Text] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.responder = responder or default_responder
+        self.system_instruction = system_instruction
+        self.calls = 0
+
+    def with_system_instruction(self, system_instruction: Text) -> "FakeGenerativeModel":
+        return FakeGenerativeModel(self.latency, self.jitter, self.failure_rate, self.responder, system_instruction)
+
+    def _usage(self, prompt: Text, answer: Text) -> FakeUsage:
+        system_tokens = estimate_tokens(self.system_instruction or "")
+        return FakeUsage(
+            prompt_token_count=system_tokens + estimate_tokens(prompt),
+            candidates_token_count=estimate_tokens(answer),
+        )
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    async def generate_content_async(self, prompt: Text, stream: bool = False) -> Any:
+        self.calls += 1
+        answer = self.responder(prompt)
+        if stream:
+            return FakeStreamResponse(answer, self._delay(), self.failure_rate, self._usage(prompt, answer))
+        await asyncio.sleep(self._delay())
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Falha simulada do modelo")
+        return FakeResponse(answer, self._usage(prompt, answer))
+
+
+class FakeStreamResponse:
+    """Resposta em streaming: a latência total é distribuída entre os trechos (um por palavra)."""
+
+    def __init__(self, text: Text, latency: float, failure_rate: float, usage_metadata: Optional[FakeUsage] = None) -> None:
+        self.words = text.split(" ")
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.usage_metadata = usage_metadata
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        step = self.latency / max(1, len(self.words))
+        for position, word in enumerate(self.words):
+            await asyncio.sleep(step)
+            if self.failure_rate and random.random() < self.failure_rate:
+                raise RuntimeError("Falha simulada do modelo")
+            last = position == len(self.words) - 1
+            yield FakeResponse(word if position == 0 else f" {word}", self.usage_metadata if last else None)
+
+
+def default_responder(prompt: Text) -> Text:
+    # Prompts de extração esperam JSON; os demais recebem um texto qualquer
+    if "JSON" in prompt:
+        return json.dumps({"especialidade": None, "nome_doutor": None, "data_preferida": None,
+                           "nome_paciente": None, "email": None})
+    return "Resposta simulada do assistente."
@@ -0,0 +1,164 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+from actions.knowledge_base import (
+    KNOWLEDGE_DIR,
+    KnowledgeBase,
+    chunk_pages,
+    extract_pages,
+    get_knowledge_base,
+    save_chunk_store,
+)
+from actions.metrics import track
+
+
+logger = logging.getLogger(__name__)
+
+# Processos usados na extração (PyMuPDF é CPU-bound) e páginas por tarefa enviada ao pool
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", str(os.cpu_count() or 2)))
+PAGES_PER_TASK = int(os.getenv("INGESTION_PAGES_PER_TASK", "16"))
+
+_SAFE_NAME_RE = re.compile(r"[^\w.-]+")
+# Subpasta onde os envios ficam até serem indexados; o refresh da base só olha a pasta principal
+STAGING_DIR_NAME = ".incoming"
+
+
+def page_count(pdf_path: Text) -> int:
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def extract_pages_parallel(pdf_path: Text, pool: Executor, pages_per_task: int = PAGES_PER_TASK) -> List[Text]:
+    """Extrai o texto de um PDF dividindo as páginas em faixas processadas em paralelo."""
+    total = page_count(pdf_path)
+    futures = [
+        pool.submit(extract_pages, pdf_path, start, start + pages_per_task)
+        for start in range(0, total, pages_per_task)
+    ]
+    pages: List[Text] = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+
+class IngestionService:
+    """Ingestão de PDFs em segundo plano: extrai em um pool de processos e indexa de forma incremental.
+
+    ``submit`` grava os arquivos e retorna imediatamente um id de job; o andamento pode ser
+    consultado com ``status``.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: Optional[KnowledgeBase] = None,
+        workers: int = INGESTION_WORKERS,
+        target_dir: Text = KNOWLEDGE_DIR,
+    ) -> None:
+        self.knowledge_base = knowledge_base
+        self.target_dir = target_dir
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Um único coordenador mantém a ordem dos jobs; o paralelismo fica no pool de processos
+        self._coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+        self.jobs: Dict[Text, Dict[Text, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def submit(self, files: List[Tuple[Text, bytes]]) -> Text:
+        """Grava os PDFs recebidos e agenda a ingestão; retorna o id do job.
+
+        Os arquivos ficam numa pasta de staging até o job indexá-los; só então são movidos
+        para ``target_dir``, para que nenhuma busca os extraia de novo enquanto o job roda.
+        """
+        job_id = uuid.uuid4().hex
+        staging_dir = os.path.join(self.target_dir, STAGING_DIR_NAME, job_id)
+        os.makedirs(staging_dir, exist_ok=True)
+        paths = []
+        for filename, body in files:
+            name = _SAFE_NAME_RE.sub("_", os.path.basename(filename)) or "documento.pdf"
+            if not name.lower().endswith(".pdf"):
+                name += ".pdf"
+            path = os.path.join(staging_dir, name)
+            with open(path, "wb") as f:
+                f.write(body)
+            paths.append(path)
+
+        with self._lock:
+            self.jobs[job_id] = {
+                "status": "queued",
+                "documents": [os.path.basename(p) for p in paths],
+                "pages": 0,
+                "chunks": 0,
+                "error": None,
+            }
+        self._coordinator.submit(self._run_job, job_id, paths, staging_dir)
+        return job_id
+
+    def status(self, job_id: Text) -> Optional[Dict[Text, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: Text, **fields: Any) -> None:
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def _run_job(self, job_id: Text, paths: List[Text], staging_dir: Text) -> None:
+        knowledge_base = self.knowledge_base or get_knowledge_base()
+        self._update(job_id, status="running")
+        start = time.perf_counter()
+        try:
+            pages_total = 0
+            chunks_total = 0
+            for path in paths:
+                # os.replace no mesmo sistema de arquivos preserva o mtime, que identifica a versão dos trechos
+                mtime = os.stat(path).st_mtime
+                target = os.path.join(self.target_dir, os.path.basename(path))
+                with track("pdf", "ingest"):
+                    pages = extract_pages_parallel(path, self.pool)
+                    chunks = chunk_pages(pages)
+                save_chunk_store(target, mtime, chunks)
+                knowledge_base.add_document(target, mtime, chunks)
+                os.replace(path, target)
+                pages_total += len(pages)
+                chunks_total += len(chunks)
+                self._update(job_id, pages=pages_total, chunks=chunks_total)
+        except Exception as e:
+            logger.error(f"Erro na ingestão do job {job_id}: {e}")
+            self._update(job_id, status="failed", error=str(e))
+            return
+        finally:
+            # Após uma falha, o que sobrou na staging não é indexado
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Job {job_id}: {pages_total} páginas ingeridas em {elapsed:.2f}s")
+        self._update(job_id, status="done", seconds=round(elapsed, 3))
+
+    def shutdown(self) -> None:
+        self._coordinator.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+_ingestion_service: Optional[IngestionService] = None
+
+
+def get_ingestion_service() -> IngestionService:
+    global _ingestion_service
+    if _ingestion_service is None:
+        _ingestion_service = IngestionService()
+    return _ingestion_service
@@ -0,0 +1,263 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Text, Tuple
+
+from actions.metrics import track
+from actions.reference_data import normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_PDF_PATH = os.getenv("KNOWLEDGE_PDF_PATH", "data/material.pdf")
+# Diretório onde ficam os PDFs enviados pelo /upload-pdf
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", "data/knowledge")
+# Tamanho dos trechos (em palavras), sobreposição entre trechos vizinhos e quantos vão para o prompt
+CHUNK_WORDS = int(os.getenv("KNOWLEDGE_CHUNK_WORDS", "160"))
+CHUNK_OVERLAP = int(os.getenv("KNOWLEDGE_CHUNK_OVERLAP", "30"))
+KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "4"))
+
+# Versão do formato do arquivo de trechos; mudar a forma de fatiar exige reextrair
+STORE_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a o as os um uma uns umas de do da dos das em no na nos nas por para com sem e ou que "
+    "se ao aos como mais mas qual quais quando onde eu voce meu minha seu sua ser ter e foi sao "
+    "esta este essa esse isso isto ha tem".split()
+)
+
+
+def tokenize(text: Text) -> List[Text]:
+    return [t for t in _TOKEN_RE.findall(normalize_text(text)) if t not in STOPWORDS]
+
+
+def chunk_pages(pages: List[Text], chunk_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[Dict[Text, Any]]:
+    """Fatia o texto de cada página em trechos de tamanho fixo, com sobreposição."""
+    chunks = []
+    step = max(1, chunk_words - overlap)
+    for page_number, text in enumerate(pages, start=1):
+        words = text.split()
+        for start in range(0, len(words), step):
+            piece = words[start:start + chunk_words]
+            if piece:
+                chunks.append({"page": page_number, "text": " ".join(piece)})
+            if start + chunk_words >= len(words):
+                break
+    return chunks
+
+
+class BM25Index:
+    """Índice léxico BM25 sobre os trechos do material.
+
+    Aceita inclusão incremental de trechos e remoção (lógica) de trechos antigos, para
+    que novos documentos entrem no índice sem reconstruí-lo do zero; ``compact`` descarta
+    de vez os removidos.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[Text, List[Tuple[int, int]]] = {}
+        self.removed: Set[int] = set()
+        self._total_length = 0
+
+    @property
+    def live_documents(self) -> int:
+        return len(self.doc_lengths) - len(self.removed)
+
+    def add(self, documents: List[List[Text]]) -> List[int]:
+        """Indexa novos trechos e retorna os ids atribuídos a eles."""
+        ids = []
+        for tokens in documents:
+            doc_id = len(self.doc_lengths)
+            self.doc_lengths.append(len(tokens))
+            self._total_length += len(tokens)
+            for term, freq in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+            ids.append(doc_id)
+        return ids
+
+    def remove(self, doc_ids: List[int]) -> None:
+        for doc_id in doc_ids:
+            if doc_id not in self.removed:
+                self.removed.add(doc_id)
+                self._total_length -= self.doc_lengths[doc_id]
+
+    def compact(self) -> Dict[int, int]:
+        """Descarta de vez os trechos removidos e renumera os demais; retorna id antigo -> id novo."""
+        mapping: Dict[int, int] = {}
+        lengths: List[int] = []
+        for doc_id, length in enumerate(self.doc_lengths):
+            if doc_id not in self.removed:
+                mapping[doc_id] = len(lengths)
+                lengths.append(length)
+        postings: Dict[Text, List[Tuple[int, int]]] = {}
+        for term, entries in self.postings.items():
+            kept = [(mapping[doc_id], freq) for doc_id, freq in entries if doc_id in mapping]
+            if kept:
+                postings[term] = kept
+        self.doc_lengths, self.postings, self.removed = lengths, postings, set()
+        return mapping
+
+    def search(self, query_tokens: List[Text], k: int) -> List[Tuple[int, float]]:
+        total = self.live_documents
+        if not total:
+            return []
+        avg_length = self._total_length / total
+        scores: Dict[int, float] = {}
+        for term in set(query_tokens):
+            postings = [p for p in self.postings.get(term, ()) if p[0] not in self.removed]
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def store_path(pdf_path: Text) -> Text:
+    return f"{os.path.splitext(pdf_path)[0]}.chunks.json"
+
+
+def load_chunk_store(pdf_path: Text, mtime: float) -> Optional[List[Dict[Text, Any]]]:
+    """Trechos persistidos de um PDF, ou None se não existirem ou estiverem desatualizados."""
+    try:
+        with open(store_path(pdf_path), encoding="utf-8") as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if store.get("version") != STORE_VERSION or store.get("mtime") != mtime:
+        return None
+    return store["chunks"]
+
+
+def save_chunk_store(pdf_path: Text, mtime: float, chunks: List[Dict[Text, Any]]) -> None:
+    path = store_path(pdf_path)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "mtime": mtime, "chunks": chunks}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Não foi possível salvar os trechos do material em {path}: {e}")
+
+
+def extract_pages(pdf_path: Text, start: int = 0, end: Optional[int] = None) -> List[Text]:
+    """Texto das páginas [start, end) de um PDF."""
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        end = doc.page_count if end is None else min(end, doc.page_count)
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def list_pdfs(directory: Text) -> List[Text]:
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(os.path.join(directory, name) for name in names if name.lower().endswith(".pdf"))
+
+
+class KnowledgeBase:
+    """Trechos pré-extraídos dos PDFs de material, persistidos em disco e indexados para busca.
+
+    Cada PDF só é lido novamente quando o seu mtime muda; nos demais casos os trechos
+    vêm do arquivo ``<pdf>.chunks.json`` ao lado do material.
+    """
+
+    def __init__(self, pdf_paths: Optional[List[Text]] = None, watch_dir: Optional[Text] = None) -> None:
+        self.pdf_paths = list(pdf_paths) if pdf_paths is not None else [KNOWLEDGE_PDF_PATH]
+        # PDFs novos nesta pasta entram no próximo refresh (ex.: enviados por outro worker)
+        self.watch_dir = watch_dir
+        self.chunks: List[Dict[Text, Any]] = []
+        self.index = BM25Index()
+        # fonte -> (mtime, ids dos trechos no índice)
+        self.documents: Dict[Text, Tuple[float, List[int]]] = {}
+        self._lock = threading.Lock()
+        # Um lock por fonte: buscas simultâneas não extraem o mesmo PDF duas vezes
+        self._source_locks: Dict[Text, threading.Lock] = {}
+
+    def add_document(self, source: Text, mtime: float, chunks: List[Dict[Text, Any]]) -> None:
+        """Inclui (ou substitui) um documento no índice sem reconstruir os demais."""
+        with self._lock:
+            previous = self.documents.get(source)
+            if previous:
+                self.index.remove(previous[1])
+            for chunk in chunks:
+                chunk.setdefault("source", os.path.basename(source))
+            ids = self.index.add([tokenize(c["text"]) for c in chunks])
+            self.chunks.extend(chunks)
+            self.documents[source] = (mtime, ids)
+            if source not in self.pdf_paths:
+                self.pdf_paths.append(source)
+            # Trechos de versões substituídas só ocupam memória: compacta quando forem metade do índice
+            if len(self.index.removed) >= self.index.live_documents:
+                self._compact()
+
+    def _compact(self) -> None:
+        mapping = self.index.compact()
+        self.chunks = [self.chunks[doc_id] for doc_id in mapping]
+        self.documents = {
+            source: (mtime, [mapping[doc_id] for doc_id in ids]) for source, (mtime, ids) in self.documents.items()
+        }
+
+    def source_lock(self, source: Text) -> threading.Lock:
+        with self._lock:
+            return self._source_locks.setdefault(source, threading.Lock())
+
+    def is_current(self, source: Text, mtime: float) -> bool:
+        with self._lock:
+            loaded = self.documents.get(source)
+        return loaded is not None and loaded[0] == mtime
+
+    def refresh(self) -> None:
+        """Recarrega os PDFs que mudaram desde a última carga (ou que nunca foram carregados)."""
+        with self._lock:
+            if self.watch_dir:
+                for pdf_path in list_pdfs(self.watch_dir):
+                    if pdf_path not in self.pdf_paths:
+                        self.pdf_paths.append(pdf_path)
+            pdf_paths = list(self.pdf_paths)
+        for pdf_path in pdf_paths:
+            try:
+                mtime = os.stat(pdf_path).st_mtime
+            except OSError:
+                continue
+            if self.is_current(pdf_path, mtime):
+                continue
+            # Quem chegar enquanto outra thread extrai este PDF espera e encontra o documento pronto
+            with self.source_lock(pdf_path):
+                if self.is_current(pdf_path, mtime):
+                    continue
+                chunks = load_chunk_store(pdf_path, mtime)
+                if chunks is None:
+                    logger.info(f"Extraindo e indexando o material {pdf_path}")
+                    with track("pdf", "extract"):
+                        chunks = chunk_pages(extract_pages(pdf_path))
+                    save_chunk_store(pdf_path, mtime, chunks)
+                self.add_document(pdf_path, mtime, chunks)
+
+    def search(self, query: Text, k: int = KNOWLEDGE_TOP_K) -> List[Dict[Text, Any]]:
+        """Retorna os k trechos mais relevantes para a pergunta."""
+        self.refresh()
+        query_tokens = tokenize(query)
+        with track("pdf", "search"), self._lock:
+            return [self.chunks[doc_id] for doc_id, _ in self.index.search(query_tokens, k)]
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    global _knowledge_base
+    if _knowledge_base is None:
+        _knowledge_base = KnowledgeBase([KNOWLEDGE_PDF_PATH] + list_pdfs(KNOWLEDGE_DIR), watch_dir=KNOWLEDGE_DIR)
+    return _knowledge_base
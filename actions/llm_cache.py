@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Text
+
+from actions.cache import TTLCache, shared_cache_path
+from actions.reference_data import normalize_text
+from actions.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# Respostas do Gemini para perguntas gerais: 1 dia em memória (LRU) e, opcionalmente, em SQLite
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAXSIZE = int(os.getenv("LLM_CACHE_MAXSIZE", "1000"))
+# Caminho do arquivo SQLite do cache persistente; vazio desativa a camada em disco, a menos que
+# os workers compartilhem caches (ACTIONS_CACHE_BACKEND=sqlite), quando vai para o mesmo arquivo
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+LLM_CACHE_DB_MAX_ROWS = int(os.getenv("LLM_CACHE_DB_MAX_ROWS", "20000"))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_question(question: Text) -> Text:
+    """Normaliza a pergunta para que variações triviais (acentos, caixa, pontuação) caiam na mesma chave."""
+    return normalize_text(_PUNCTUATION_RE.sub(" ", question))
+
+
+def cache_key(question: Text, template_version: Text) -> Text:
+    return hashlib.sha1(f"{template_version}\x00{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+
+class SqliteResponseStore:
+    """Camada persistente do cache de respostas, que sobrevive a reinícios do servidor.
+
+    Como no ``SqliteCache``, a conexão é de cada processo: um worker criado por fork abre a sua.
+    """
+
+    def __init__(self, path: Text, max_rows: int = LLM_CACHE_DB_MAX_ROWS) -> None:
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Abre já no início para que um caminho inválido desative a camada em disco logo de cara
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # Vários workers podem ler e gravar o mesmo arquivo
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: Text) -> Optional[Text]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: Text, value: Text, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._writes += 1
+            # A limpeza é feita a cada 100 escritas para não pesar em todas elas
+            if self._writes % 100 == 0:
+                self._prune(conn, now)
+            conn.commit()
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+
+class LLMResponseCache:
+    """Cache de respostas do LLM em duas camadas: memória (LRU + TTL) e SQLite opcional."""
+
+    def __init__(
+        self,
+        ttl: float = LLM_CACHE_TTL,
+        maxsize: int = LLM_CACHE_MAXSIZE,
+        db_path: Optional[Text] = None,
+    ) -> None:
+        if db_path is None:
+            db_path = LLM_CACHE_DB or shared_cache_path() or ""
+        self.ttl = ttl
+        self.memory = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.store: Optional[SqliteResponseStore] = None
+        if db_path:
+            try:
+                self.store = SqliteResponseStore(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache persistente de respostas desativado ({db_path}): {e}")
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+
+    def get(self, question: Text, template_version: Text) -> Optional[Text]:
+        key = cache_key(question, template_version)
+        answer = self.memory.get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+
+        if self.store is not None:
+            try:
+                answer = self.store.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao ler o cache persistente de respostas: {e}")
+            if answer is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, answer)
+                return answer
+
+        self.misses += 1
+        return None
+
+    def set(self, question: Text, template_version: Text, answer: Text) -> None:
+        key = cache_key(question, template_version)
+        self.memory.set(key, answer)
+        if self.store is not None:
+            try:
+                self.store.set(key, answer, self.ttl)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar no cache persistente de respostas: {e}")
+
+    async def generate_shared(
+        self, question: Text, template_version: Text, generate: Callable[[], Awaitable[Text]]
+    ) -> Text:
+        """Gera e guarda a resposta; a mesma pergunta feita ao mesmo tempo por vários usuários gera uma vez só."""
+
+        async def produce() -> Text:
+            answer = await generate()
+            self.set(question, template_version, answer)
+            return answer
+
+        return await self.flights.do(cache_key(question, template_version), produce)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[Text, Any]:
+        total = self.hits + self.misses
+        memory = self.memory.stats()
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            # Só a camada em memória descarta entradas; o arquivo expira pelo TTL
+            "evictions": memory["evictions"],
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "memory": memory,
+            "persistent": self.store is not None,
+            "coalesced": self.flights.coalesced,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMResponseCache()
+    return _response_cache
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Text, Tuple, Union
+
+from actions.metrics import track
+from actions.prompts import Prompt, estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# Chamadas simultâneas ao Gemini por processo; as demais esperam na fila até LLM_QUEUE_TIMEOUT
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+# Prazo de cada chamada ao modelo, em segundos
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+# Falhas seguidas que abrem o circuito e por quanto tempo ele fica aberto
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+LATENCY_SAMPLES = 500
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+
+class LLMUnavailableError(Exception):
+    """O LLM não pode atender agora (circuito aberto, fila cheia ou prazo estourado)."""
+
+
+class CircuitBreaker:
+    """Abre após ``threshold`` falhas seguidas; depois de ``reset_timeout`` deixa passar uma chamada de teste."""
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_timeout: float = LLM_BREAKER_RESET) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> Text:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def end_probe(self) -> None:
+        """Libera a vaga de teste se a chamada terminou sem resultado (ex.: cancelada)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuito do LLM aberto após {self.failures} falhas seguidas")
+            self.opened_at = time.monotonic()
+
+
+def create_default_model() -> Any:
+    """Cria o modelo configurado pelo ambiente (Gemini ou o modelo falso local); None se faltar a chave.
+
+    O ``google.generativeai`` só é importado aqui, pois sozinho leva mais de um segundo para carregar.
+    """
+    if os.getenv("LLM_BACKEND") == "fake":
+        from actions.fake_llm import FakeGenerativeModel
+
+        # Modelo local, sem rede, para testes de carga e desenvolvimento
+        return FakeGenerativeModel(latency=float(os.getenv("FAKE_LLM_LATENCY", "0.05")))
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("Chave de API do Gemini não encontrada. Verifique seu arquivo .env")
+        return None
+
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
+
+
+def with_system_instruction(model: Any, system_instruction: Text) -> Optional[Any]:
+    """Variante do modelo com o preâmbulo fixo como system_instruction; None se o modelo não suportar.
+
+    A variante é criada uma vez por preâmbulo e reaproveitada: nenhum modelo é montado por
+    chamada, e o início de cada requisição é sempre o mesmo preâmbulo, seguido só da parte variável.
+    """
+    derive = getattr(model, "with_system_instruction", None)
+    if derive is not None:
+        return derive(system_instruction)
+    if getattr(model, "model_name", None) is None:
+        return None
+    import google.generativeai as genai
+
+    if not isinstance(model, genai.GenerativeModel):
+        return None
+    return genai.GenerativeModel(model.model_name, system_instruction=system_instruction)
+
+
+class LLMGateway:
+    """Ponto único de acesso ao modelo: limita concorrência, aplica prazos e um circuit breaker.
+
+    Qualquer objeto com ``generate_content_async(prompt)`` serve como modelo, o que permite
+    trocar o Gemini por um modelo falso local (ver ``actions.fake_llm``). Com ``model_factory``,
+    o modelo só é criado no primeiro uso.
+    """
+
+    def __init__(
+        self,
+        model: Any = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout: float = LLM_TIMEOUT,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        breaker: Optional[CircuitBreaker] = None,
+        model_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self._model = model
+        self._model_factory = model_factory if model is None else None
+        self._model_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.counters = {"calls": 0, "errors": 0, "timeouts": 0, "rejected": 0}
+        self._latencies: Dict[Text, Deque[float]] = {}
+        self._variants: Dict[Text, Optional[Any]] = {}
+        # Tokens por label: entrada e saída
+        self.tokens: Dict[Text, Dict[Text, int]] = {}
+
+    @property
+    def model(self) -> Any:
+        # A fábrica é chamada uma única vez, mesmo que retorne None (ex.: chave de API ausente)
+        if self._model_factory is not None:
+            with self._model_lock:
+                if self._model_factory is not None:
+                    factory, self._model_factory = self._model_factory, None
+                    self._model = factory()
+        return self._model
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None and self.breaker.state != "open"
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Criado no primeiro uso para ficar associado ao event loop do servidor
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _acquire(self) -> None:
+        semaphore = self._get_semaphore()
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return
+
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.counters["rejected"] += 1
+            raise LLMUnavailableError("Fila do LLM cheia")
+        finally:
+            self.queue_depth -= 1
+
+    async def _admit(self) -> bool:
+        """Passa pelo circuit breaker e pela fila; ao retornar, a vaga no semáforo é do chamador.
+
+        Retorna True se esta é a chamada de teste do estado half_open.
+        """
+        if self.model is None:
+            raise LLMUnavailableError("Modelo não configurado")
+        if self.breaker.state == "open":
+            self.counters["rejected"] += 1
+            raise LLMUnavailableError("Circuito do LLM aberto")
+
+        await self._acquire()
+        # Conferido de novo após a fila: no estado half_open só uma chamada de teste passa
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self._get_semaphore().release()
+            self.counters["rejected"] += 1
+            raise LLMUnavailableError("Circuito do LLM aberto")
+        self.in_flight += 1
+        self.counters["calls"] += 1
+        return probe
+
+    def _release(self, label: Text, elapsed: float) -> None:
+        self.in_flight -= 1
+        self._get_semaphore().release()
+        self._record(label, elapsed)
+
+    def _record(self, label: Text, elapsed: float) -> None:
+        self._latencies.setdefault(label, deque(maxlen=LATENCY_SAMPLES)).append(elapsed)
+
+    def _prepare(self, prompt: Union[Text, Prompt]) -> Tuple[Any, Text, int]:
+        """Modelo e conteúdo a enviar, mais a estimativa de tokens de entrada."""
+        if not isinstance(prompt, Prompt):
+            return self.model, prompt, estimate_tokens(prompt)
+        if prompt.system not in self._variants:
+            self._variants[prompt.system] = with_system_instruction(self.model, prompt.system)
+        variant = self._variants[prompt.system]
+        if variant is None:
+            return self.model, prompt.full_text, prompt.tokens
+        return variant, prompt.text, prompt.tokens
+
+    def _record_usage(self, label: Text, response: Any, estimated_prompt: int, output: Text) -> None:
+        """Contabiliza os tokens da chamada; usa o usage_metadata da API quando houver, senão a estimativa."""
+        usage = getattr(response, "usage_metadata", None)
+        totals = self.tokens.setdefault(label, {"calls": 0, "prompt": 0, "output": 0, "max_prompt": 0})
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimated_prompt
+        totals["calls"] += 1
+        totals["prompt"] += prompt_tokens
+        totals["output"] += getattr(usage, "candidates_token_count", 0) or estimate_tokens(output)
+        totals["max_prompt"] = max(totals["max_prompt"], prompt_tokens)
+
+    async def generate(self, prompt: Union[Text, Prompt], label: Text = "default", timeout: Optional[float] = None) -> Text:
+        """Gera a resposta do modelo para o prompt (texto ou ``Prompt`` com preâmbulo) e retorna o texto."""
+        probe = await self._admit()
+        start = time.perf_counter()
+        try:
+            model, contents, estimated = self._prepare(prompt)
+            async with track("llm", label):
+                response = await asyncio.wait_for(
+                    model.generate_content_async(contents), timeout or self.timeout
+                )
+                text = response.text
+            self._record_usage(label, response, estimated, text)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.breaker.record_failure()
+            raise LLMUnavailableError(f"O LLM excedeu o prazo de {timeout or self.timeout}s")
+        except Exception:
+            self.counters["errors"] += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            # Cancelada (CancelledError), a chamada de teste não conta como falha, mas libera a vaga
+            if probe:
+                self.breaker.end_probe()
+            self._release(label, time.perf_counter() - start)
+
+        self.breaker.record_success()
+        return text
+
+    async def stream(self, prompt: Union[Text, Prompt], label: Text = "default", timeout: Optional[float] = None) -> AsyncIterator[Text]:
+        """Gera a resposta em streaming, produzindo os trechos de texto conforme chegam.
+
+        O prazo vale para a geração inteira; o tempo até o primeiro trecho é registrado
+        em ``<label>:first_chunk``.
+        """
+        probe = await self._admit()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        deadline = loop.time() + (timeout or self.timeout)
+        first_chunk = True
+        last_chunk = None
+        parts = []
+        try:
+            model, contents, estimated = self._prepare(prompt)
+            async with track("llm", label):
+                response = await asyncio.wait_for(
+                    model.generate_content_async(contents, stream=True), deadline - loop.time()
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    if first_chunk:
+                        self._record(f"{label}:first_chunk", time.perf_counter() - start)
+                        first_chunk = False
+                    last_chunk = chunk
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+            # O usage_metadata do último trecho traz os totais da geração
+            self._record_usage(label, last_chunk, estimated, "".join(parts))
+            self.breaker.record_success()
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.breaker.record_failure()
+            raise LLMUnavailableError(f"O LLM excedeu o prazo de {timeout or self.timeout}s")
+        except Exception:
+            self.counters["errors"] += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            # Leitor desconectado (GeneratorExit) ou tarefa cancelada: só libera a vaga de teste
+            if probe:
+                self.breaker.end_probe()
+            self._release(label, time.perf_counter() - start)
+
+    def stats(self) -> Dict[Text, Any]:
+        latencies = {}
+        for label, samples in self._latencies.items():
+            ordered = sorted(samples)
+            latencies[label] = {
+                "calls": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return {
+            **self.counters,
+            "breaker": self.breaker.state,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency": latencies,
+            "tokens": {label: dict(totals) for label, totals in self.tokens.items()},
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Gateway compartilhado pelo processo; o modelo padrão é criado na primeira chamada ao LLM."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(model_factory=create_default_model)
+    return _gateway
@@ -0,0 +1,210 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Text, Tuple
+
+
+# Latência por ação e por dependência (DB, LLM, PDF); desligado, ``track`` não custa quase nada
+ACTIONS_METRICS = os.getenv("ACTIONS_METRICS", "true").lower() in ("1", "true", "yes")
+# Spans por conversa (sender_id), consultáveis em /metrics/traces/<sender_id>
+ACTIONS_TRACING = os.getenv("ACTIONS_TRACING", "false").lower() in ("1", "true", "yes")
+TRACE_MAX_SENDERS = int(os.getenv("TRACE_MAX_SENDERS", "200"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "200"))
+
+# Limites superiores (segundos) dos buckets dos histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Key = Tuple[Text, Text]  # (tipo, nome), ex.: ("db", "getSpecialties")
+
+# Conversa e ação em andamento na requisição atual: (sender_id, ação, início)
+_current_trace: contextvars.ContextVar[Optional[Tuple[Text, Text, float]]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # o último é o +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[Text, int]]:
+        total, result = 0, []
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class _Tracked:
+    """Mede um trecho (``with`` ou ``async with``): latência, erro, chamadas em andamento e span."""
+
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics: "Metrics", key: Key) -> None:
+        self.metrics = metrics
+        self.key = key
+        self.start = 0.0
+
+    def __enter__(self) -> "_Tracked":
+        self.metrics._begin(self.key)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.metrics._end(self.key, self.start, time.perf_counter() - self.start, exc_type is None)
+
+    async def __aenter__(self) -> "_Tracked":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+class _Noop:
+    """Substituto de ``_Tracked`` quando as métricas estão desligadas."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
+_NOOP = _Noop()
+
+
+class Metrics:
+    """Histogramas de latência, contadores de erro e chamadas em andamento por (tipo, nome)."""
+
+    def __init__(self, enabled: bool = ACTIONS_METRICS, tracing: bool = ACTIONS_TRACING) -> None:
+        self.enabled = enabled
+        self.tracing = enabled and tracing
+        self._lock = threading.Lock()
+        self.latency: Dict[Key, Histogram] = {}
+        self.errors: Dict[Key, int] = {}
+        self.in_flight: Dict[Key, int] = {}
+        self.traces: "OrderedDict[Text, Deque[Dict[Text, Any]]]" = OrderedDict()
+        self._collectors: List[Callable[[], Iterable[Tuple[Text, Dict[Text, Text], float]]]] = []
+
+    def track(self, kind: Text, name: Text) -> Any:
+        """Context manager que mede uma chamada, ex.: ``async with metrics.track("db", action):``."""
+        if not self.enabled:
+            return _NOOP
+        return _Tracked(self, (kind, name))
+
+    def _begin(self, key: Key) -> None:
+        with self._lock:
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def _end(self, key: Key, start: float, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight[key] -= 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(elapsed)
+            if not ok:
+                self.errors[key] = self.errors.get(key, 0) + 1
+        if self.tracing:
+            self._record_span(key, start, elapsed, ok)
+
+    # --- spans por conversa ---
+
+    def begin_action(self, action: Text, sender_id: Optional[Text]) -> Any:
+        """Abre a medição de uma ação; os spans das dependências chamadas nela ficam ligados ao sender_id."""
+        if not self.enabled:
+            return None
+        token = _current_trace.set((sender_id, action, time.perf_counter())) if self.tracing and sender_id else None
+        tracked = _Tracked(self, ("action", action))
+        tracked.__enter__()
+        return tracked, token
+
+    def end_action(self, handle: Any, ok: bool) -> None:
+        if handle is None:
+            return
+        tracked, token = handle
+        tracked.__exit__(None if ok else RuntimeError, None, None)
+        if token is not None:
+            _current_trace.reset(token)
+
+    def _record_span(self, key: Key, start: float, elapsed: float, ok: bool) -> None:
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        sender_id, action, trace_start = trace
+        span = {
+            "action": action,
+            "kind": key[0],
+            "name": key[1],
+            "offset_ms": round((start - trace_start) * 1000, 2),
+            "duration_ms": round(elapsed * 1000, 2),
+            "ok": ok,
+            "at": time.time(),
+        }
+        with self._lock:
+            spans = self.traces.get(sender_id)
+            if spans is None:
+                spans = self.traces[sender_id] = deque(maxlen=TRACE_MAX_SPANS)
+                while len(self.traces) > TRACE_MAX_SENDERS:
+                    self.traces.popitem(last=False)
+            else:
+                self.traces.move_to_end(sender_id)
+            spans.append(span)
+
+    def spans(self, sender_id: Text) -> Optional[List[Dict[Text, Any]]]:
+        with self._lock:
+            spans = self.traces.get(sender_id)
+            return list(spans) if spans is not None else None
+
+    # --- exposição ---
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[Text, Dict[Text, Text], float]]]) -> None:
+        """Acrescenta gauges calculados na hora da leitura (ex.: taxa de acerto dos caches)."""
+        self._collectors.append(collector)
+
+    def render(self) -> Text:
+        """Métricas no formato de texto do Prometheus."""
+        lines = ["# TYPE actions_latency_seconds histogram"]
+        with self._lock:
+            for (kind, name), histogram in sorted(self.latency.items()):
+                labels = f'kind="{kind}",name="{name}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'actions_latency_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"actions_latency_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"actions_latency_seconds_count{{{labels}}} {histogram.count}")
+            lines.append("# TYPE actions_errors_total counter")
+            for (kind, name), count in sorted(self.errors.items()):
+                lines.append(f'actions_errors_total{{kind="{kind}",name="{name}"}} {count}')
+            lines.append("# TYPE actions_in_flight gauge")
+            for (kind, name), count in sorted(self.in_flight.items()):
+                lines.append(f'actions_in_flight{{kind="{kind}",name="{name}"}} {count}')
+
+        for collector in self._collectors:
+            for metric, labels, value in collector():
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def track(kind: Text, name: Text) -> Any:
+    """Atalho para ``metrics.track``."""
+    return metrics.track(kind, name)
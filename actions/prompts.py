@@ -0,0 +1,139 @@
+import math
+import os
+from textwrap import dedent
+from typing import Dict, List, NamedTuple, Optional, Sequence, Text
+
+
+# Estimativa local de tokens (sem chamar o count_tokens da API): ~4 caracteres por token em português
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+
+# Orçamento de tokens de entrada por ação; pode ser sobrescrito com PROMPT_BUDGET_<ACAO>
+PROMPT_BUDGETS: Dict[Text, int] = {
+    "general_question": 300,
+    "extract_info": 250,
+    "pdf_question": 1200,
+}
+DEFAULT_PROMPT_BUDGET = 500
+# Limite para o texto do usuário, para uma mensagem colada enorme não consumir o orçamento todo
+USER_TEXT_MAX_TOKENS = int(os.getenv("PROMPT_USER_TEXT_MAX_TOKENS", "150"))
+# Abaixo disso não vale a pena incluir um trecho de contexto cortado
+MIN_CONTEXT_TOKENS = 40
+
+
+def estimate_tokens(text: Text) -> int:
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: Text, max_tokens: int) -> Text:
+    """Corta o texto para caber em ``max_tokens``, sem partir palavras."""
+    max_chars = int(max_tokens * PROMPT_CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[: max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _budget_for(label: Text) -> int:
+    override = os.getenv(f"PROMPT_BUDGET_{label.upper()}")
+    if override:
+        return int(override)
+    return PROMPT_BUDGETS.get(label, DEFAULT_PROMPT_BUDGET)
+
+
+class Prompt(NamedTuple):
+    label: Text
+    system: Text  # preâmbulo fixo da ação, enviado como system_instruction
+    text: Text  # parte variável: pergunta e contexto
+    tokens: int  # estimativa de tokens de entrada (preâmbulo + texto)
+    context_used: int
+    context_dropped: int
+
+    @property
+    def full_text(self) -> Text:
+        """Prompt em um único texto, para modelos sem system_instruction."""
+        return f"{self.system}\n\n{self.text}"
+
+
+class PromptTemplate:
+    """Prompt de uma ação: preâmbulo fixo, modelo da parte variável e orçamento de tokens.
+
+    O preâmbulo é idêntico em todas as chamadas, o que permite ao Gemini tratá-lo como
+    system_instruction de um modelo reaproveitado. O contexto (ex.: trechos do PDF) entra
+    em ordem de relevância enquanto couber no orçamento.
+    """
+
+    def __init__(self, label: Text, system: Text, template: Text, budget: Optional[int] = None) -> None:
+        self.label = label
+        self.system = dedent(system).strip()
+        self.template = dedent(template).strip()
+        self.budget = budget if budget is not None else _budget_for(label)
+        self.system_tokens = estimate_tokens(self.system)
+
+    def build(self, context: Sequence[Text] = (), **fields: Text) -> Prompt:
+        fields = {name: truncate_to_tokens(str(value), USER_TEXT_MAX_TOKENS) for name, value in fields.items()}
+        remaining = self.budget - self.system_tokens - estimate_tokens(self.template.format(context="", **fields))
+
+        chosen: List[Text] = []
+        for item in context:
+            cost = estimate_tokens(item) + 1  # separador
+            if cost <= remaining:
+                chosen.append(item)
+                remaining -= cost
+            elif not chosen and remaining >= MIN_CONTEXT_TOKENS:
+                # Nem o trecho mais relevante cabe inteiro: vai cortado, em vez de nenhum contexto
+                chosen.append(truncate_to_tokens(item, remaining))
+                remaining = 0
+
+        text = self.template.format(context="\n\n".join(chosen), **fields)
+        return Prompt(
+            label=self.label,
+            system=self.system,
+            text=text,
+            tokens=self.system_tokens + estimate_tokens(text),
+            context_used=len(chosen),
+            context_dropped=len(context) - len(chosen),
+        )
+
+
+GENERAL_QUESTION_PROMPT = PromptTemplate(
+    "general_question",
+    system="""
+    Você é um assistente virtual de uma clínica chamada "Clínica Super Saudável".
+    Sua função primária é agendar consultas. Responda a perguntas gerais sobre saúde de forma prestativa, mas NUNCA forneça diagnósticos.
+    Se o usuário perguntar algo que você não sabe ou que pareça um pedido de diagnóstico, guie-o a marcar uma consulta.
+    """,
+    template="""
+    Pergunta do Usuário: "{question}"
+    Sua Resposta:
+    """,
+)
+
+EXTRACT_INFO_PROMPT = PromptTemplate(
+    "extract_info",
+    system="""
+    Analise a frase do usuário e extraia as informações pedidas em formato JSON. Se uma informação não estiver presente, use "null".
+    """,
+    template="""
+    Entidades: {entities}.
+    Frase: "{sentence}"
+    JSON:
+    """,
+)
+
+PDF_QUESTION_PROMPT = PromptTemplate(
+    "pdf_question",
+    system="""
+    Você é um assistente da Clínica Super Saudável. Responda à pergunta do usuário com base nos trechos fornecidos, retirados de um material PDF.
+    """,
+    template="""
+    --- TRECHOS DO MATERIAL ---
+    {context}
+    --- FIM DOS TRECHOS ---
+
+    Pergunta: "{question}"
+    Resposta:
+    """,
+)
@@ -0,0 +1,71 @@
+import logging
+import os
+import unicodedata
+from typing import Any, Dict, List, Optional, Text
+
+from actions.cache import create_cache
+from actions.db_client import get_async_db_client
+
+
+logger = logging.getLogger(__name__)
+
+# Especialidades e médicos quase nunca mudam; 10 minutos é um bom compromisso
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "600"))
+
+reference_cache = create_cache("reference", ttl=REFERENCE_CACHE_TTL, maxsize=256)
+
+
+def normalize_text(text: Text) -> Text:
+    """Normaliza um texto para comparação: minúsculo, sem acentos e sem espaços extras."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.lower().split())
+
+
+async def get_specialties() -> Optional[List[Dict[Text, Any]]]:
+    """Lista de especialidades, servida do cache quando possível."""
+    specialties = reference_cache.get("specialties")
+    if specialties is not None:
+        return specialties
+
+    specialties = await get_async_db_client().call("getSpecialties")
+    if specialties is None:
+        return None
+
+    # O índice nome normalizado -> especialidade é construído uma única vez por carga
+    reference_cache.set("specialties", specialties)
+    reference_cache.set("specialty_index", {normalize_text(s["name"]): s for s in specialties})
+    return specialties
+
+
+async def find_specialty(name: Text) -> Optional[Dict[Text, Any]]:
+    """Busca uma especialidade pelo nome, ignorando maiúsculas e acentos."""
+    index = reference_cache.get("specialty_index")
+    if index is None:
+        if await get_specialties() is None:
+            return None
+        index = reference_cache.get("specialty_index", {})
+    return index.get(normalize_text(name))
+
+
+async def get_doctors_by_specialty(specialty_id: Any) -> Optional[List[Dict[Text, Any]]]:
+    """Médicos de uma especialidade, servidos do cache quando possível."""
+    key = ("doctors", str(specialty_id))
+    doctors = reference_cache.get(key)
+    if doctors is not None:
+        return doctors
+
+    doctors = await get_async_db_client().call("getDoctorsBySpecialty", str(specialty_id))
+    if doctors is not None:
+        reference_cache.set(key, doctors)
+    return doctors
+
+
+def invalidate_reference_data() -> None:
+    """Descarta especialidades e médicos em cache (ex.: após alterar o cadastro)."""
+    logger.info("Invalidando cache de especialidades e médicos")
+    reference_cache.clear()
+
+
+def reference_cache_stats() -> Dict[Text, Any]:
+    return reference_cache.stats()
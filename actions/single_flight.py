@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Text, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Junta chamadas idênticas simultâneas: a primeira vai ao serviço, as demais esperam o mesmo resultado.
+
+    Só vale enquanto a chamada está em andamento; o que chega depois dela terminar faz uma
+    chamada nova (guardar o resultado é papel dos caches).
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, key=key: self._discard(key, done))
+        else:
+            self.coalesced += 1
+        # shield: se um dos que esperam for cancelado, a chamada continua para os demais
+        return await asyncio.shield(task)
+
+    def _discard(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        # Após um forget, a chave pode já apontar para uma chamada mais nova
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def forget(self, key: Hashable) -> None:
+        """Quem chegar depois não aproveita a chamada em andamento (ex.: o dado mudou desde que ela começou)."""
+        self._tasks.pop(key, None)
+
+    def stats(self) -> Dict[Text, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
@@ -0,0 +1,128 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Text, Tuple
+
+from actions.reference_data import normalize_text
+
+
+# "15:30", "15h30", "15h", "15 horas", "9 e meia", "1º"/"1a", números soltos e palavras
+_TOKEN_RE = re.compile(r"(\d{1,2})(?:[:h](\d{2})|(h|hs|hrs?)\b|([oa])\b)?|([a-z]+)")
+
+ORDINALS = {
+    "primeiro": 0, "primeira": 0, "segundo": 1, "segunda": 1, "terceiro": 2, "terceira": 2,
+    "quarto": 3, "quarta": 3, "quinto": 4, "quinta": 4, "sexto": 5, "sexta": 5,
+    "setimo": 6, "setima": 6, "oitavo": 7, "oitava": 7, "nono": 8, "nona": 8, "decimo": 9, "decima": 9,
+    "ultimo": -1, "ultima": -1,
+}
+# Palavras que tornam o número seguinte uma posição na lista ("opção 2")
+POSITION_MARKERS = frozenset({"opcao", "numero", "alternativa", "n"})
+PERIODS = {"manha": (0, 12), "tarde": (12, 18), "noite": (18, 24)}
+HOUR_WORDS = frozenset({"hora", "horas"})
+
+
+class SlotIndex:
+    """Índice dos horários oferecidos, para resolver a escolha do usuário em uma única passada.
+
+    Os horários são indexados por HH:MM, por hora cheia e por período do dia; posições
+    ("o primeiro", "opção 2") são resolvidas direto na lista, na ordem em que foi exibida.
+    """
+
+    def __init__(self, slots: Sequence[Text]) -> None:
+        self.slots = list(slots)
+        self.by_time: Dict[Tuple[int, int], Text] = {}
+        self.by_hour: Dict[int, List[Text]] = {}
+        self.by_period: Dict[Text, List[Text]] = {period: [] for period in PERIODS}
+        for slot in self.slots:
+            try:
+                hour, minute = (int(part) for part in slot.split(":"))
+            except ValueError:
+                continue
+            self.by_time.setdefault((hour, minute), slot)
+            self.by_hour.setdefault(hour, []).append(slot)
+            for period, (start, end) in PERIODS.items():
+                if start <= hour < end:
+                    self.by_period[period].append(slot)
+
+    def _at(self, candidates: List[Text], position: int) -> Optional[Text]:
+        if -len(candidates) <= position < len(candidates):
+            return candidates[position]
+        return None
+
+    def resolve(self, text: Text) -> Optional[Text]:
+        """Horário escolhido no texto, ou None se a resposta não corresponder a nenhum horário oferecido.
+
+        Prioridade: horário exato, depois hora cheia (ajustada por "da tarde"/"da noite"),
+        depois posição (dentro do período citado, se houver) e, por fim, só o período.
+        """
+        exact = None
+        hours: List[int] = []  # números marcados como hora ("15h", "15:30", "3 horas")
+        position = None
+        bare_numbers: List[int] = []
+        period = None
+        previous = None
+        last_number = None
+
+        for match in _TOKEN_RE.finditer(normalize_text(text)):
+            number, minutes, hour_suffix, ordinal_suffix, word = match.groups()
+            if word:
+                if word in ORDINALS and position is None:
+                    position = ORDINALS[word]
+                elif word in PERIODS:
+                    period = word
+                elif word == "meia" and previous == "e" and last_number is not None:
+                    exact = exact or self.by_time.get((last_number, 30)) or self.by_time.get((last_number + 12, 30))
+                elif word == "dia" and previous == "meio":
+                    hours.append(12)
+                elif word in HOUR_WORDS and bare_numbers:
+                    hours.append(bare_numbers.pop())
+                previous = word
+                continue
+
+            value = last_number = int(number)
+            if minutes is not None:
+                exact = exact or self.by_time.get((value, int(minutes)))
+                hours.append(value)
+            elif hour_suffix:
+                hours.append(value)
+            elif ordinal_suffix:
+                position = value - 1 if position is None else position
+            elif previous in POSITION_MARKERS:
+                position = value - 1
+            else:
+                bare_numbers.append(value)
+            previous = number
+
+        if exact:
+            return exact
+
+        # "3 da tarde" -> 15h; números soltos também podem ser uma hora ("às 9")
+        for hour in hours + bare_numbers:
+            if period in ("tarde", "noite") and hour < 12:
+                hour += 12
+            if hour in self.by_hour:
+                return self.by_hour[hour][0]
+
+        candidates = self.by_period[period] if period else self.slots
+        if position is not None:
+            return self._at(candidates, position)
+        # Número solto que não é uma hora oferecida: posição na lista ("2" -> segundo horário)
+        for number in bare_numbers:
+            if 1 <= number <= len(candidates):
+                return candidates[number - 1]
+        if period and candidates:
+            return candidates[0]
+        return None
+
+
+@lru_cache(maxsize=256)
+def _cached_index(slots: Tuple[Text, ...]) -> SlotIndex:
+    return SlotIndex(slots)
+
+
+def get_slot_index(slots: Sequence[Text]) -> SlotIndex:
+    """Índice dos horários oferecidos, montado uma vez por oferta e reaproveitado a cada resposta."""
+    return _cached_index(tuple(slots))
+
+
+def resolve_slot(slots: Sequence[Text], text: Text) -> Optional[Text]:
+    return get_slot_index(slots).resolve(text)
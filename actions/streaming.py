@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional, Text, Tuple
+
+from rasa_sdk import Tracker
+
+
+logger = logging.getLogger(__name__)
+
+# Desligado por padrão: exige o servidor de ações customizado, que expõe /stream/<id>
+LLM_STREAMING = os.getenv("LLM_STREAMING", "false").lower() in ("1", "true", "yes")
+# URL pela qual o navegador alcança o servidor de ações
+ACTION_SERVER_PUBLIC_URL = os.getenv("ACTION_SERVER_PUBLIC_URL", "http://localhost:5055")
+# Canais cujo cliente sabe consumir o stream (o frontend usa o canal REST)
+STREAMING_CHANNELS = {"rest"}
+# Por quanto tempo uma resposta fica disponível para o cliente se conectar
+STREAM_TTL = float(os.getenv("STREAM_TTL", "300"))
+
+
+class AnswerStream:
+    """Trechos de uma resposta em geração, que podem ser lidos enquanto chegam."""
+
+    def __init__(self) -> None:
+        self.chunks: List[Text] = []
+        self.done = False
+        self.error: Optional[Text] = None
+        self.created_at = time.monotonic()
+        # Tarefa que consome a geração; a referência evita que seja coletada no meio do stream
+        self.task: Optional["asyncio.Task[None]"] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # Cada leitor aguarda o evento da vez; um novo evento é criado para a próxima mudança
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def push(self, chunk: Text) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def close(self, error: Optional[Text] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def iter_chunks(self) -> AsyncIterator[Text]:
+        position = 0
+        while True:
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+
+class StreamRegistry:
+    def __init__(self, ttl: float = STREAM_TTL) -> None:
+        self.ttl = ttl
+        self._streams: Dict[Text, AnswerStream] = {}
+
+    def create(self) -> Tuple[Text, AnswerStream]:
+        self._purge()
+        stream_id = uuid.uuid4().hex
+        stream = AnswerStream()
+        self._streams[stream_id] = stream
+        return stream_id, stream
+
+    def get(self, stream_id: Text) -> Optional[AnswerStream]:
+        return self._streams.get(stream_id)
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        expired = [sid for sid, s in self._streams.items() if now - s.created_at > self.ttl]
+        for stream_id in expired:
+            stream = self._streams.pop(stream_id)
+            if stream.task is not None and not stream.task.done():
+                stream.task.cancel()
+
+
+stream_registry = StreamRegistry()
+
+
+def should_stream(tracker: Tracker) -> bool:
+    """Só faz streaming quando habilitado e quando o canal do usuário consegue consumir o stream."""
+    return LLM_STREAMING and tracker.get_latest_input_channel() in STREAMING_CHANNELS
+
+
+def start_stream(chunks: AsyncIterator[Text], on_complete: Optional[Callable[[Text], None]] = None) -> Text:
+    """Consome ``chunks`` em segundo plano, publicando cada trecho; retorna o id do stream."""
+    stream_id, stream = stream_registry.create()
+
+    async def produce() -> None:
+        try:
+            async for chunk in chunks:
+                stream.push(chunk)
+        except asyncio.CancelledError:
+            stream.close(error="cancelado")
+            raise
+        except Exception as e:
+            logger.error(f"Erro durante o streaming da resposta {stream_id}: {e}")
+            stream.close(error=str(e))
+            return
+        stream.close()
+        if on_complete is not None:
+            on_complete("".join(stream.chunks))
+
+    stream.task = asyncio.ensure_future(produce())
+    return stream_id
+
+
+def stream_message(stream_id: Text) -> Dict[Text, Text]:
+    """Mensagem custom que indica ao frontend onde ler a resposta em streaming."""
+    return {"stream_id": stream_id, "stream_url": f"{ACTION_SERVER_PUBLIC_URL}/stream/{stream_id}"}
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import IO, Optional, Tuple
+
+from sanic import Sanic
+
+from actions.entity_extractor import get_gazetteer
+from actions.knowledge_base import get_knowledge_base
+from actions.llm_gateway import get_llm_gateway
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem coordenação entre processos
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# Pré-inicializa os clientes em segundo plano logo após o servidor começar a aceitar requisições
+ACTIONS_WARM_UP = os.getenv("ACTIONS_WARM_UP", "true").lower() in ("1", "true", "yes")
+# Lock entre os workers: só quem o obtém aquece o que é compartilhado (material e caches)
+ACTIONS_WARM_UP_LOCK = os.getenv(
+    "ACTIONS_WARM_UP_LOCK", os.path.join(tempfile.gettempdir(), "rasa_actions_warmup.lock")
+)
+
+
+def warm_up_model() -> None:
+    """Cria o modelo do LLM (e importa o SDK); é de cada processo, não precisa esperar os demais."""
+    get_llm_gateway().model
+
+
+def try_acquire_warm_up_lock(path: Optional[str] = None) -> Tuple[bool, Optional[IO]]:
+    """(se este processo deve aquecer a parte compartilhada, lock a liberar depois); não bloqueia."""
+    if fcntl is None:
+        return True, None
+    path = path or ACTIONS_WARM_UP_LOCK
+    try:
+        lock_file = open(path, "a")
+    except OSError as e:
+        logger.warning(f"Aquecimento sem coordenação entre workers ({path}): {e}")
+        return True, None
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False, None
+    return True, lock_file
+
+
+def release_warm_up_lock(lock_file: Optional[IO]) -> None:
+    if lock_file is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+async def warm_up_shared() -> bool:
+    """Extrai o material e preenche os caches compartilhados, a menos que outro worker já esteja fazendo isso.
+
+    Retorna False quando outro worker tem o lock: este não repete o trabalho, e o material
+    (persistido em ``<pdf>.chunks.json``) e as especialidades são carregados no primeiro uso.
+    """
+    is_first, lock_file = try_acquire_warm_up_lock()
+    if not is_first:
+        return False
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, get_knowledge_base().refresh)
+        # Busca as especialidades (abrindo a sessão HTTP com a API) e monta o gazetteer
+        await get_gazetteer()
+    finally:
+        release_warm_up_lock(lock_file)
+    return True
+
+
+async def warm_up_async() -> None:
+    """Aquece tudo sem bloquear o event loop; falhas só são registradas, o primeiro uso tenta de novo."""
+    start = time.perf_counter()
+    # O modelo é de cada processo e é criado em paralelo com a parte compartilhada
+    model_ready = asyncio.get_running_loop().run_in_executor(None, warm_up_model)
+    failed = False
+    try:
+        shared = await warm_up_shared()
+    except asyncio.CancelledError:
+        model_ready.cancel()
+        raise
+    except Exception as e:
+        logger.warning(f"Falha no aquecimento do material e das especialidades: {e}")
+        failed, shared = True, False
+    # Espera o modelo mesmo se a parte acima falhou, para que o erro dele também seja lido
+    try:
+        await model_ready
+    except Exception as e:
+        logger.warning(f"Falha ao criar o modelo do LLM no aquecimento: {e}")
+        failed = True
+    if failed:
+        return
+    scope = "completo" if shared else "só o modelo; outro worker aquece o material"
+    logger.info(f"Servidor de ações aquecido em {time.perf_counter() - start:.2f}s ({scope}, pid {os.getpid()})")
+
+
+def schedule_warm_up(app: Sanic) -> None:
+    """Agenda o aquecimento para depois que o servidor subir, sem atrasar o início do atendimento."""
+    if not ACTIONS_WARM_UP:
+        return
+
+    @app.listener("after_server_start")
+    async def start_warm_up(app, loop):
+        app.add_task(warm_up_async())
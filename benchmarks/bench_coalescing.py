@@ -0,0 +1,84 @@
+"""Chamadas ao serviço durante um pico de requisições idênticas, com e sem coalescência.
+
+Uso:
+    python -m benchmarks.bench_coalescing [--burst 200] [--db-latency 0.05] [--llm-latency 0.3]
+
+Dispara, ao mesmo tempo, --burst pedidos de getSpecialties, --burst pedidos de horários do
+mesmo médico/data e --burst perguntas gerais iguais, e conta quantas chamadas chegaram à API
+do banco falsa (benchmarks/fake_db_api.py) e ao modelo falso, e quanto tempo o pico levou.
+O comportamento (uma chamada por grupo) é conferido em tests/test_coalescing.py.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+from actions.db_client import AsyncDbServiceClient
+from actions.fake_llm import FakeGenerativeModel
+from actions.llm_cache import LLMResponseCache
+from actions.llm_gateway import LLMGateway
+from benchmarks.fake_db_api import start_fake_db_api
+
+
+async def db_burst(url: str, burst: int, coalesce: bool, api: Any) -> Tuple[int, float]:
+    client = AsyncDbServiceClient(base_url=url, coalesce=coalesce)
+    before = api.requests
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client.call("getSpecialties") for _ in range(burst)),
+        *(client.call("getAvailableSlotsByDoctorAndDate", "1", "2026-10-19") for _ in range(burst)),
+    )
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return api.requests - before, elapsed
+
+
+async def llm_burst(burst: int, latency: float, coalesce: bool) -> Tuple[int, float]:
+    model = FakeGenerativeModel(latency=latency)
+    gateway = LLMGateway(model=model, max_concurrency=burst, queue_timeout=None)
+    cache = LLMResponseCache(db_path="")
+    question = "Quais convênios vocês aceitam?"
+
+    async def ask() -> str:
+        if coalesce:
+            return await cache.generate_shared(question, "bench", lambda: gateway.generate(question, label="bench"))
+        answer = await gateway.generate(question, label="bench")
+        cache.set(question, "bench", answer)
+        return answer
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask() for _ in range(burst)))
+    return model.calls, time.perf_counter() - start
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    api, runner, url = await start_fake_db_api(latency=args.db_latency)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for coalesce in (False, True):
+            db_calls, db_elapsed = await db_burst(url, args.burst, coalesce, api)
+            llm_calls, llm_elapsed = await llm_burst(args.burst, args.llm_latency, coalesce)
+            results["com coalescência" if coalesce else "sem coalescência"] = {
+                "db_calls": db_calls, "db_s": db_elapsed, "llm_calls": llm_calls, "llm_s": llm_elapsed,
+            }
+    finally:
+        await runner.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=200, help="pedidos idênticos simultâneos por grupo")
+    parser.add_argument("--db-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print(f"{2 * args.burst} leituras do banco (2 grupos) e {args.burst} perguntas iguais ao LLM")
+    print(f"{'':18} {'chamadas DB':>12} {'tempo DB':>9} {'chamadas LLM':>13} {'tempo LLM':>10}")
+    for name, r in results.items():
+        print(f"{name:18} {r['db_calls']:>12} {r['db_s']:>8.2f}s {r['llm_calls']:>13} {r['llm_s']:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
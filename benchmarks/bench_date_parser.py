@@ -0,0 +1,78 @@
+"""Mede o custo por expressão do parser de datas, com e sem o cache de resultados.
+
+Uso:
+    python -m benchmarks.bench_date_parser [--repeat 200]
+
+Usa as expressões de benchmarks/date_corpus.py (conferidas em tests/test_date_parser.py) e
+compara o parser com a lógica que existia em validate_data_preferida (reproduzida abaixo),
+que só entende DD/MM, hoje, amanhã e dias da semana. "Sem cache" é a primeira vez que uma
+expressão aparece; "com cache", as repetições ("amanhã", "sexta", o DD/MM/AAAA do botão).
+"""
+import argparse
+import re
+import time
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+
+from actions.date_parser import _find, parse_date_expression
+from benchmarks.date_corpus import CORPUS, REFERENCE_DATE
+
+
+LEGACY_WEEKDAY_MAP = {
+    "segunda": 0, "segunda-feira": 0, "terça": 1, "terça-feira": 1, "quarta": 2, "quarta-feira": 2,
+    "quinta": 3, "quinta-feira": 3, "sexta": 4, "sexta-feira": 4, "sábado": 5, "domingo": 6,
+}
+
+
+def legacy_parse(text: str, today: date) -> Optional[date]:
+    """Lógica anterior: regex não compilada, testes de substring e varredura do mapa de dias."""
+    text = text.lower()
+    match_date = re.match(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?', text)
+    if match_date:
+        day, month, year = match_date.groups()
+        try:
+            if year:
+                year_int = int(year)
+                if len(year) == 2:
+                    year_int = 2000 + year_int if year_int < 50 else 1900 + year_int
+                target = date(year_int, int(month), int(day))
+            else:
+                target = date(today.year, int(month), int(day))
+            if target < today:
+                target = date(today.year + 1, int(month), int(day))
+            return target
+        except ValueError:
+            pass
+    if "hoje" in text:
+        return today
+    if "amanhã" in text:
+        return today + timedelta(days=1)
+    for day_name, day_index in LEGACY_WEEKDAY_MAP.items():
+        if day_name in text:
+            return today + timedelta(days=(day_index - today.weekday()) % 7)
+    return None
+
+
+def per_call_us(parse: Callable[[str, date], object], texts: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse(text, REFERENCE_DATE)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    texts = [text for text, _, _ in CORPUS]
+    legacy_hits = sum(1 for text, start, end in CORPUS if start == end and legacy_parse(text, REFERENCE_DATE) == start)
+    print(f"{len(CORPUS)} expressões; a lógica anterior acerta {legacy_hits}")
+    print(f"parser sem cache: {per_call_us(_find, texts, args.repeat):8.2f} µs/expressão")
+    print(f"parser com cache: {per_call_us(parse_date_expression, texts, args.repeat):8.2f} µs/expressão")
+    print(f"lógica anterior:  {per_call_us(legacy_parse, texts, args.repeat):8.2f} µs/expressão")
+
+
+if __name__ == "__main__":
+    main()
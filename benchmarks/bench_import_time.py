@@ -0,0 +1,84 @@
+"""Mede o tempo de import a frio do pacote de ações (cada medição em um processo novo).
+
+Uso:
+    python -m benchmarks.bench_import_time [--module actions.actions] [--repeat 7] [--top 10]
+    python -m benchmarks.bench_import_time --save baseline.json
+    python -m benchmarks.bench_import_time --baseline baseline.json [--max-regression 0.2]
+
+Com --baseline, termina com código 1 se a mediana piorar mais que --max-regression (fração).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+def measure_once(module: str) -> Tuple[float, Dict[str, float]]:
+    """Importa o módulo com ``-X importtime``; retorna o tempo total e o cumulativo de cada módulo (em s)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        if not total.strip().isdigit():
+            continue
+        cumulative[name.strip()] = int(total) / 1_000_000
+    return cumulative.get(module, 0.0), cumulative
+
+
+def heaviest(samples: List[Dict[str, float]], module: str, top: int) -> List[Tuple[str, float]]:
+    # Só dependências de primeiro nível (sem pontos), fora o próprio pacote medido
+    package = module.split(".")[0]
+    names = {name for sample in samples for name in sample if "." not in name and name != package}
+    medians = {name: statistics.median(sample.get(name, 0.0) for sample in samples) for name in names}
+    return sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="actions.actions")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="quantos módulos mais pesados listar")
+    parser.add_argument("--save", help="grava o resultado em JSON para servir de referência")
+    parser.add_argument("--baseline", help="JSON gravado com --save para comparação")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    measure_once(args.module)  # o primeiro processo também compila os .pyc
+    totals, samples = [], []
+    for _ in range(args.repeat):
+        total, cumulative = measure_once(args.module)
+        totals.append(total)
+        samples.append(cumulative)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: mediana {median * 1000:.0f} ms  mín {min(totals) * 1000:.0f} ms  ({args.repeat} execuções)")
+    print("módulos mais pesados (cumulativo):")
+    for name, seconds in heaviest(samples, args.module, args.top):
+        print(f"  {name:30s} {seconds * 1000:8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"module": args.module, "median": median, "min": min(totals)}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        change = median / baseline["median"] - 1
+        print(f"referência: {baseline['median'] * 1000:.0f} ms  variação: {change:+.1%}")
+        if change > args.max_regression:
+            print("regressão no tempo de import acima do limite")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara a extração de páginas de PDF em série e em paralelo (pool de processos).
+
+Uso:
+    python -m benchmarks.bench_pdf_ingestion [--pdf caminho.pdf] [--pages 400] [--workers 4]
+
+Sem --pdf, gera um PDF sintético com o número de páginas pedido.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from actions.ingestion import PAGES_PER_TASK, extract_pages_parallel
+from actions.knowledge_base import extract_pages
+
+
+PARAGRAPH = (
+    "A Clínica Vértice atende convênios Unimed, Amil e Bradesco Saúde. Exames de sangue exigem jejum "
+    "de 8 horas e devem ser agendados com antecedência. O horário de funcionamento é de segunda a "
+    "sexta, das 8h às 18h, e aos sábados das 8h às 12h. "
+)
+
+
+def build_synthetic_pdf(path: str, pages: int) -> None:
+    import fitz
+
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 560, 800), f"Página {number + 1}. " + PARAGRAPH * 12, fontsize=9)
+    doc.save(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="PDF a ser extraído (padrão: PDF sintético)")
+    parser.add_argument("--pages", type=int, default=400, help="páginas do PDF sintético")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages-per-task", type=int, default=PAGES_PER_TASK)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if not pdf_path:
+            pdf_path = os.path.join(tmp, "sintetico.pdf")
+            build_synthetic_pdf(pdf_path, args.pages)
+
+        serial = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            pages = extract_pages(pdf_path)
+            serial.append(time.perf_counter() - start)
+
+        parallel = []
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            extract_pages_parallel(pdf_path, pool, args.pages_per_task)  # aquece os processos
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                extract_pages_parallel(pdf_path, pool, args.pages_per_task)
+                parallel.append(time.perf_counter() - start)
+
+    total = len(pages)
+    best_serial, best_parallel = min(serial), min(parallel)
+    print(f"páginas: {total}  workers: {args.workers}  páginas/tarefa: {args.pages_per_task}")
+    print(f"serial:   {total / best_serial:10.1f} páginas/s  ({best_serial:.3f}s)")
+    print(f"paralelo: {total / best_parallel:10.1f} páginas/s  ({best_parallel:.3f}s)")
+    print(f"speedup:  {best_serial / best_parallel:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compara a resolução do horário escolhido com o índice e com as três varreduras anteriores.
+
+Uso:
+    python -m benchmarks.bench_slot_matcher [--repeat 2000]
+
+Mede o custo por resposta para listas de horários de granularidade crescente (60, 30 e
+15 minutos, das 7h às 19h). O índice é montado uma vez por oferta, como no formulário.
+"""
+import argparse
+import re
+import time
+from typing import Callable, List, Optional
+
+from actions.slot_matcher import get_slot_index
+
+
+REPLIES = ["15:00", "às 9h", "o primeiro", "opção 2", "a terceira", "4 e meia da tarde", "de manhã", "não sei"]
+
+
+def legacy_resolve(horarios_disponiveis: List[str], user_text: str) -> Optional[str]:
+    """Lógica anterior de validate_horario_escolhido."""
+    user_text = user_text.lower()
+    for horario in horarios_disponiveis:
+        if horario in user_text:
+            return horario
+    for num_str in re.findall(r'\d+', user_text):
+        for horario in horarios_disponiveis:
+            if horario.startswith(num_str.zfill(2)):
+                return horario
+    posicoes = {
+        "primeiro": 0, "primeira": 0, "1": 0,
+        "segundo": 1, "segunda": 1, "2": 1,
+        "terceiro": 2, "terceira": 2, "3": 2,
+    }
+    for palavra, index in posicoes.items():
+        if palavra in user_text and len(horarios_disponiveis) > index:
+            return horarios_disponiveis[index]
+    return None
+
+
+def build_slots(step_minutes: int) -> List[str]:
+    return [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(7 * 60, 19 * 60, step_minutes)]
+
+
+def per_reply_us(resolve: Callable[[str], Optional[str]], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for reply in REPLIES:
+            resolve(reply)
+    return (time.perf_counter() - start) / (repeat * len(REPLIES)) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'granularidade':>14} {'horários':>9} {'índice (µs)':>12} {'anterior (µs)':>14}")
+    for step in (60, 30, 15):
+        slots = build_slots(step)
+        index = get_slot_index(slots)
+        indexed = per_reply_us(index.resolve, args.repeat)
+        legacy = per_reply_us(lambda reply: legacy_resolve(slots, reply), args.repeat)
+        print(f"{step:>11} min {len(slots):>9} {indexed:>12.2f} {legacy:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Corpus de expressões de data com o resultado esperado do ``actions.date_parser``.
+
+Todas as datas esperadas são relativas a REFERENCE_DATE (quarta-feira, 12/03/2025).
+Cada entrada é (texto, início, fim); início/fim None significa "nenhuma data reconhecida".
+"""
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+REFERENCE_DATE = date(2025, 3, 12)
+
+Entry = Tuple[str, Optional[date], Optional[date]]
+
+
+def _d(day: int, month: int = 3, year: int = 2025) -> date:
+    return date(year, month, day)
+
+
+def _single(text: str, day: Optional[date]) -> Entry:
+    return (text, day, day)
+
+
+# Datas numéricas: o formato do slot (DD/MM/YYYY) e as variações digitadas pelo usuário
+NUMERIC: List[Entry] = [
+    _single("15/03", _d(15)),
+    _single("15/03/2025", _d(15)),
+    _single("15/03/25", _d(15)),
+    _single("5/4", _d(5, 4)),
+    _single("05/04", _d(5, 4)),
+    _single("12/03", _d(12)),
+    _single("10/03", _d(10, 3, 2026)),
+    _single("10/03/2025", _d(10, 3, 2026)),
+    _single("01/01", _d(1, 1, 2026)),
+    _single("01/01/26", _d(1, 1, 2026)),
+    _single("31/12/2025", _d(31, 12)),
+    _single("15-03-2025", _d(15)),
+    _single("15.03.2025", _d(15)),
+    _single("dia 15.03", _d(15)),
+    # "." e "-" sem o ano de 4 dígitos: valores, horários e faixas, não datas
+    _single("15.03", None),
+    _single("10.5", None),
+    _single("9-12", None),
+    _single("opção 9-12", None),
+    _single("pode ser das 9-12h", None),
+    _single("15-03", None),
+    _single("29/02", None),
+    _single("31/04", None),
+    _single("32/01", None),
+    _single("15/13", None),
+    _single("pode ser 20/03?", _d(20)),
+    _single("quero no dia 20/03 de manhã", _d(20)),
+    _single("31/02 ou amanhã", _d(13)),
+]
+
+RELATIVE: List[Entry] = [
+    _single("hoje", _d(12)),
+    _single("Hoje", _d(12)),
+    _single("hoje à tarde", _d(12)),
+    _single("amanhã", _d(13)),
+    _single("amanha", _d(13)),
+    _single("AMANHÃ", _d(13)),
+    _single("pode ser amanhã?", _d(13)),
+    _single("depois de amanhã", _d(14)),
+    _single("depois de amanha", _d(14)),
+    _single("daqui a 3 dias", _d(15)),
+    _single("daqui a três dias", _d(15)),
+    _single("daqui a um dia", _d(13)),
+    _single("em 2 dias", _d(14)),
+    _single("em dez dias", _d(22)),
+]
+
+DAY_OF_MONTH: List[Entry] = [
+    _single("dia 15", _d(15)),
+    _single("no dia 15", _d(15)),
+    _single("dia 12", _d(12)),
+    _single("dia 5", _d(5, 4)),
+    _single("dia 31", _d(31)),
+    _single("dia 15 de abril", _d(15, 4)),
+    _single("dia 20 de maio", _d(20, 5)),
+    _single("15 de fevereiro", _d(15, 2, 2026)),
+    _single("1 de março", _d(1, 3, 2026)),
+    _single("1º de abril", None),
+    _single("dia 31 de abril", None),
+    _single("dia 40", None),
+    _single("dia 10 de dez", _d(10, 12)),
+]
+
+RANGES: List[Entry] = [
+    ("semana que vem", _d(17), _d(23)),
+    ("na semana que vem", _d(17), _d(23)),
+    ("próxima semana", _d(17), _d(23)),
+    ("proxima semana", _d(17), _d(23)),
+    ("essa semana", _d(12), _d(16)),
+    ("nesta semana", _d(12), _d(16)),
+    ("fim de semana", _d(15), _d(16)),
+    ("no final de semana", _d(15), _d(16)),
+    ("mês que vem", _d(1, 4), _d(30, 4)),
+    ("próximo mês", _d(1, 4), _d(30, 4)),
+]
+
+WEEKDAY_DATES = {
+    "segunda": _d(17), "terça": _d(18), "terca": _d(18), "quarta": _d(12), "quinta": _d(13),
+    "sexta": _d(14), "sábado": _d(15), "sabado": _d(15), "domingo": _d(16),
+}
+WORKDAYS = ("segunda", "terça", "terca", "quarta", "quinta", "sexta")
+
+WEEKDAYS: List[Entry] = (
+    [_single(name, day) for name, day in WEEKDAY_DATES.items()]
+    + [_single(name.capitalize(), day) for name, day in WEEKDAY_DATES.items()]
+    + [_single(f"na {name}", day) for name, day in WEEKDAY_DATES.items()]
+    + [_single(f"{name}-feira", WEEKDAY_DATES[name]) for name in WORKDAYS]
+    + [_single(f"{name} feira", WEEKDAY_DATES[name]) for name in WORKDAYS]
+    # "próxima"/"que vem" nunca é hoje
+    + [
+        _single(f"próxima {name}", day + timedelta(days=7) if day == REFERENCE_DATE else day)
+        for name, day in WEEKDAY_DATES.items()
+    ]
+    + [
+        _single(f"{name} que vem", day + timedelta(days=7) if day == REFERENCE_DATE else day)
+        for name, day in WEEKDAY_DATES.items()
+    ]
+    + [_single("quarta-feira que vem", _d(19)), _single("próximo sábado", _d(15))]
+)
+
+# Frases sem data, incluindo ordinais que não devem ser lidos como dia da semana
+NO_DATE: List[Entry] = [
+    _single("", None),
+    _single("quero marcar uma consulta", None),
+    _single("cardiologia", None),
+    _single("a segunda opção", None),
+    _single("a terceira opção", None),
+    _single("segunda vez que tento", None),
+    _single("quinta consulta", None),
+    _single("às 15h", None),
+    _single("semana", None),
+    _single("dia", None),
+    _single("não sei", None),
+]
+
+SENTENCES: List[Entry] = [
+    _single("quero marcar com a dra ana na sexta de manhã", _d(14)),
+    _single("tem horário pra quinta às 10?", _d(13)),
+    _single("meu email é ana.15@x.com, pode ser amanhã", _d(13)),
+    ("qualquer dia da semana que vem serve", _d(17), _d(23)),
+    _single("prefiro o dia 20, se possível", _d(20)),
+    _single("segunda-feira às 9h, a segunda opção", _d(17)),
+]
+
+CORPUS: List[Entry] = NUMERIC + RELATIVE + DAY_OF_MONTH + RANGES + WEEKDAYS + NO_DATE + SENTENCES
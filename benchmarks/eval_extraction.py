@@ -0,0 +1,237 @@
+"""Avaliação em lote da extração de informações do agendamento (action_extract_info_with_gemini).
+
+Uso:
+    python -m benchmarks.eval_extraction [--output extraction.jsonl] [--concurrency 16]
+    python -m benchmarks.eval_extraction --corpus logs.jsonl --backend gemini
+
+Roda a mesma extração da ação (local + Gemini) para cada frase do corpus, com chamadas
+assíncronas limitadas por --concurrency, e grava um resultado por linha em --output. O
+arquivo de saída é também o checkpoint: ao rodar de novo, as frases já avaliadas são
+puladas (use --restart para começar do zero).
+
+Corpus: os exemplos de data/nlu.yml, com as entidades anotadas ([texto](entidade)), ou um
+JSONL com {"text": ..., "entities": {slot: valor}} (ex.: tráfego registrado; sem "entities",
+a frase entra no resultado mas não na precisão/revocação).
+
+Por padrão usa o modelo falso local (--backend fake, latência em --llm-latency), sem rede;
+com --backend gemini, usa GEMINI_API_KEY. O gazetteer vem da API do banco (DATABASE_API_URL),
+se estiver acessível; com --no-gazetteer, a extração local fica só com regex.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Text, Tuple
+
+import yaml
+
+from actions.actions import ActionExtractInfoWithGemini
+from actions.entity_extractor import get_gazetteer
+from actions.llm_gateway import get_llm_gateway
+from actions.reference_data import normalize_text
+
+
+# Slots que a extração produz e que são comparados com as anotações
+EVAL_SLOTS = ("especialidade", "doctor_name", "data_preferida", "nome_paciente", "email")
+
+# [texto](entidade) ou [texto]{"entity": "entidade", "value": "valor"}
+_ANNOTATION_RE = re.compile(r"\[([^\]]+)\](?:\((\w+)\)|(\{[^}]*\}))")
+
+
+def parse_example(example: Text) -> Tuple[Text, Dict[Text, Text]]:
+    """Texto limpo e entidades anotadas de um exemplo do nlu.yml."""
+    entities: Dict[Text, Text] = {}
+
+    def replace(match: "re.Match[Text]") -> Text:
+        text, entity, attributes = match.groups()
+        if attributes:
+            data = json.loads(attributes)
+            entity, text_value = data.get("entity"), data.get("value", text)
+        else:
+            text_value = text
+        if entity:
+            entities.setdefault(entity, text_value)
+        return text
+
+    return _ANNOTATION_RE.sub(replace, example), entities
+
+
+def load_nlu_corpus(path: Text) -> Iterator[Dict[Text, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    for block in data.get("nlu", []):
+        if "intent" not in block:
+            continue
+        for line in block.get("examples", "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                text, entities = parse_example(line[2:])
+                yield {"text": text, "intent": block["intent"], "entities": entities}
+
+
+def load_jsonl_corpus(path: Text) -> Iterator[Dict[Text, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield {"text": item["text"], "intent": item.get("intent"), "entities": item.get("entities")}
+
+
+def load_corpus(path: Text) -> List[Dict[Text, Any]]:
+    """Frases do corpus, sem repetições, cada uma com um id estável (hash do texto)."""
+    loader = load_jsonl_corpus if path.endswith(".jsonl") else load_nlu_corpus
+    corpus, seen = [], set()
+    for item in loader(path):
+        item_id = hashlib.sha1(item["text"].encode("utf-8")).hexdigest()[:16]
+        if item_id not in seen:
+            seen.add(item_id)
+            corpus.append({"id": item_id, **item})
+    return corpus
+
+
+def load_checkpoint(path: Text) -> Set[Text]:
+    """Ids já avaliados no arquivo de saída; uma linha incompleta (execução interrompida) é ignorada."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+async def run_batch(
+    corpus: List[Dict[Text, Any]], output_path: Text, concurrency: int, gazetteer: Any
+) -> Dict[Text, Any]:
+    # Em lote, a fila do gateway não deve recusar chamadas: o limite é o --concurrency
+    gateway = get_llm_gateway()
+    gateway.max_concurrency = concurrency
+    gateway.queue_timeout = None
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counters = {"done": 0, "llm_calls": 0, "errors": 0}
+
+    with open(output_path, "a", encoding="utf-8") as output:
+
+        async def evaluate(item: Dict[Text, Any]) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                slots, llm_called, error = await ActionExtractInfoWithGemini.extract(item["text"], gazetteer)
+                elapsed = time.perf_counter() - start
+            counters["done"] += 1
+            counters["llm_calls"] += llm_called
+            counters["errors"] += error is not None
+            record = {**item, "predicted": slots, "llm_called": llm_called, "error": error,
+                      "latency_ms": round(elapsed * 1000, 2)}
+            # Uma linha completa por frase, gravada assim que termina: é o checkpoint
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(evaluate(item) for item in corpus))
+        counters["elapsed_s"] = time.perf_counter() - start
+    return counters
+
+
+def values_match(predicted: Any, expected: Text) -> bool:
+    """Comparação tolerante: ignora acentos e caixa, aceita um contido no outro
+    ("Dr. João Silva" x "João Silva") e o mesmo radical ("cardiologista" x "Cardiologia")."""
+    a, b = normalize_text(str(predicted)), normalize_text(expected)
+    if not a or not b:
+        return False
+    if a == b or a in b or b in a:
+        return True
+    prefix = os.path.commonprefix([a, b])
+    return len(prefix) >= 6 and len(prefix) >= min(len(a), len(b)) - 4
+
+
+def score(results_path: Text) -> Dict[Text, Dict[Text, float]]:
+    """Precisão, revocação e F1 por slot (e no total) sobre todas as frases anotadas do arquivo."""
+    counts = {slot: {"tp": 0, "fp": 0, "fn": 0} for slot in EVAL_SLOTS}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            expected = record.get("entities")
+            if expected is None:
+                continue
+            predicted = record.get("predicted") or {}
+            for slot in EVAL_SLOTS:
+                if slot in predicted and slot in expected and values_match(predicted[slot], expected[slot]):
+                    counts[slot]["tp"] += 1
+                    continue
+                if slot in predicted:
+                    counts[slot]["fp"] += 1
+                if slot in expected:
+                    counts[slot]["fn"] += 1
+
+    counts["total"] = {key: sum(c[key] for c in counts.values()) for key in ("tp", "fp", "fn")}
+    report = {}
+    for slot, c in counts.items():
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+        recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        report[slot] = {**c, "precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3)}
+    return report
+
+
+async def load_gazetteer(enabled: bool) -> Optional[Any]:
+    if not enabled:
+        return None
+    gazetteer = await get_gazetteer()
+    if gazetteer is None:
+        print("API do banco indisponível: extração local sem gazetteer")
+    return gazetteer
+
+
+async def main_async(args: argparse.Namespace, corpus: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+    gazetteer = await load_gazetteer(not args.no_gazetteer)
+    return await run_batch(corpus, args.output, args.concurrency, gazetteer)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="data/nlu.yml", help="nlu.yml do Rasa ou JSONL com {text, entities}")
+    parser.add_argument("--output", default="extraction_results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--backend", choices=("fake", "gemini"), default="fake")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="latência do modelo falso (s)")
+    parser.add_argument("--no-gazetteer", action="store_true")
+    parser.add_argument("--restart", action="store_true", help="descarta o checkpoint e avalia tudo de novo")
+    parser.add_argument("--limit", type=int, help="avalia só as primeiras N frases do corpus")
+    args = parser.parse_args()
+
+    if args.backend == "fake":
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    corpus = load_corpus(args.corpus)[: args.limit]
+    done = load_checkpoint(args.output)
+    pending = [item for item in corpus if item["id"] not in done]
+    print(f"{len(corpus)} frases no corpus, {len(corpus) - len(pending)} já avaliadas, {len(pending)} pendentes")
+
+    if pending:
+        counters = asyncio.run(main_async(args, pending))
+        rate = counters["done"] / counters["elapsed_s"] if counters["elapsed_s"] else 0.0
+        print(f"{counters['done']} frases em {counters['elapsed_s']:.2f}s ({rate:.1f}/s), "
+              f"{counters['llm_calls']} chamadas ao LLM, {counters['errors']} erros")
+
+    report = score(args.output)
+    print(f"{'slot':16} {'acertos':>8} {'falsos+':>8} {'falsos-':>8} {'precisão':>9} {'revocação':>10} {'F1':>6}")
+    for slot, stats in report.items():
+        print(f"{slot:16} {stats['tp']:>8} {stats['fp']:>8} {stats['fn']:>8} "
+              f"{stats['precision']:>9.3f} {stats['recall']:>10.3f} {stats['f1']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
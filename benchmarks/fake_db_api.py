@@ -0,0 +1,160 @@
+"""API do banco em memória, com as mesmas rotas e respostas de src/service.ts, para benchmarks.
+
+A latência de cada resposta é configurável, para simular a rede e o Postgres sem depender deles.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+
+SPECIALTIES = ["Cardiologia", "Clínica Geral", "Dermatologia", "Ortopedia", "Pediatria"]
+DOCTORS_PER_SPECIALTY = 3
+# Agenda de todos os médicos: segunda a sábado, das 8h às 17h, de hora em hora
+WORK_DAYS = {1, 2, 3, 4, 5, 6}  # getUTCDay(): 0 = domingo
+WORK_HOURS = range(8, 17)
+MAX_RANGE_DAYS = 31
+
+
+class FakeDbApi:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.specialties: List[Dict[str, Any]] = []
+        self.doctors: Dict[int, Dict[str, Any]] = {}
+        doctor_id = 1
+        for specialty_id, name in enumerate(SPECIALTIES, start=1):
+            doctors = []
+            for number in range(DOCTORS_PER_SPECIALTY):
+                doctor = {"id": doctor_id, "name": f"Dr. {name.split()[0]} {number + 1}", "specialtyId": specialty_id}
+                self.doctors[doctor_id] = doctor
+                doctors.append(doctor)
+                doctor_id += 1
+            self.specialties.append({"id": specialty_id, "name": name, "description": None, "doctors": doctors})
+        self.patients: Dict[str, Dict[str, Any]] = {}
+        self.appointments: Dict[int, Dict[str, Any]] = {}
+        self.booked: Set[Tuple[int, str]] = set()  # (médico, "YYYY-MM-DDTHH:MM")
+        self.by_idempotency_key: Dict[str, int] = {}
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        delay = max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _slots(self, doctor_id: int, date_str: str) -> List[str]:
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        if (day.weekday() + 1) % 7 not in WORK_DAYS:
+            return []
+        return [
+            f"{hour:02d}:00" for hour in WORK_HOURS if (doctor_id, f"{date_str}T{hour:02d}:00") not in self.booked
+        ]
+
+    # --- rotas ---
+
+    async def specialties_handler(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(self.specialties)
+
+    async def doctors_by_specialty(self, request: web.Request) -> web.Response:
+        await self._delay()
+        specialty_id = int(request.match_info["specialty_id"])
+        availability = [
+            {"dayOfWeek": day, "startTime": f"{WORK_HOURS[0]:02d}:00", "endTime": f"{WORK_HOURS[-1] + 1:02d}:00"}
+            for day in sorted(WORK_DAYS)
+        ]
+        doctors = [
+            dict(d, specialty={"id": specialty_id}, availability=availability)
+            for d in self.doctors.values() if d["specialtyId"] == specialty_id
+        ]
+        return web.json_response(doctors)
+
+    async def doctor_slots(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(self._slots(int(request.match_info["doctor_id"]), request.query["date"]))
+
+    async def range_slots(self, request: web.Request) -> web.Response:
+        await self._delay()
+        start = datetime.strptime(request.query["from"], "%Y-%m-%d")
+        end = datetime.strptime(request.query.get("to", request.query["from"]), "%Y-%m-%d")
+        days = (end - start).days + 1
+        if days < 1 or days > MAX_RANGE_DAYS:
+            return web.json_response({"error": "Intervalo inválido."}, status=400)
+        if "specialtyId" in request.query:
+            specialty_id = int(request.query["specialtyId"])
+            doctors = [d for d in self.doctors.values() if d["specialtyId"] == specialty_id]
+        else:
+            ids = {int(i) for i in request.query["doctorIds"].split(",")}
+            doctors = [d for d in self.doctors.values() if d["id"] in ids]
+        result = []
+        for offset in range(days):
+            date_str = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for doctor in doctors:
+                result.append({
+                    "doctorId": doctor["id"], "doctorName": doctor["name"], "date": date_str,
+                    "slots": self._slots(doctor["id"], date_str),
+                })
+        return web.json_response(result)
+
+    def _patient(self, email: str, name: str) -> Dict[str, Any]:
+        if email not in self.patients:
+            self.patients[email] = {"id": len(self.patients) + 1, "email": email, "name": name}
+        return self.patients[email]
+
+    async def patients_handler(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        return web.json_response(self._patient(body["email"], body["name"]))
+
+    def _create_appointment(self, patient_id: int, doctor_id: int, when: str, key: Optional[str]) -> Dict[str, Any]:
+        appointment_id = len(self.appointments) + 1
+        appointment = {"id": appointment_id, "patientId": patient_id, "doctorId": doctor_id, "dateTime": when}
+        self.appointments[appointment_id] = appointment
+        self.booked.add((doctor_id, when[:16]))
+        if key:
+            self.by_idempotency_key[key] = appointment_id
+        return appointment
+
+    async def appointments_handler(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        appointment = self._create_appointment(body["patientId"], int(body["doctorId"]), body["dateTime"], None)
+        return web.json_response(appointment, status=201)
+
+    async def bookings_handler(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        key = body["idempotencyKey"]
+        if key in self.by_idempotency_key:
+            return web.json_response(self.appointments[self.by_idempotency_key[key]])
+        doctor_id = int(body["doctorId"])
+        when = body["dateTime"]
+        if (doctor_id, when[:16]) in self.booked or when[11:16] not in self._slots(doctor_id, when[:10]):
+            return web.json_response({"error": "Horário indisponível.", "code": "SLOT_UNAVAILABLE"}, status=409)
+        patient = self._patient(body["email"], body["name"])
+        return web.json_response(self._create_appointment(patient["id"], doctor_id, when, key), status=201)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/specialties", self.specialties_handler)
+        app.router.add_get("/doctors/specialty/{specialty_id}", self.doctors_by_specialty)
+        app.router.add_get("/doctors/{doctor_id}/available-slots", self.doctor_slots)
+        app.router.add_get("/available-slots", self.range_slots)
+        app.router.add_post("/patients", self.patients_handler)
+        app.router.add_post("/appointments", self.appointments_handler)
+        app.router.add_post("/bookings", self.bookings_handler)
+        return app
+
+
+async def start_fake_db_api(host: str = "127.0.0.1", port: int = 0, **kwargs: Any) -> Tuple[FakeDbApi, web.AppRunner, str]:
+    """Sobe a API falsa no event loop atual; retorna (api, runner, url base). Encerre com ``runner.cleanup()``."""
+    api = FakeDbApi(**kwargs)
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return api, runner, f"http://{host}:{bound_port}"
@@ -0,0 +1,324 @@
+"""Teste de carga do servidor de ações: conversas realistas contra o /webhook, com DB e Gemini falsos.
+
+Uso:
+    python -m benchmarks.load_test [--users 20] [--conversations 200] [--db-latency 0.02] [--llm-latency 0.3]
+    python -m benchmarks.load_test --save baseline.json
+    python -m benchmarks.load_test --baseline baseline.json [--max-regression 0.2]
+
+Sobe a API do banco em memória (benchmarks/fake_db_api.py) neste processo e o servidor de ações
+em um subprocesso (--server-cmd) com LLM_BACKEND=fake. Com --url, usa um servidor já em execução,
+que deve apontar DATABASE_API_URL para a URL da API falsa impressa no início.
+
+Cada usuário virtual repete conversas sorteadas conforme --mix:
+  booking: especialidade -> médico -> data -> horário -> agendamento
+  general: pergunta geral (Gemini, com repetições que passam pelo cache)
+  pdf:     pergunta sobre o material da clínica (PDF sintético)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import yaml
+
+from benchmarks.bench_pdf_ingestion import build_synthetic_pdf
+from benchmarks.fake_db_api import SPECIALTIES, start_fake_db_api
+
+
+GENERAL_QUESTIONS = [
+    "Quais convênios vocês aceitam?",
+    "Qual o horário de funcionamento?",
+    "Preciso de jejum para exame de sangue?",
+    "Vocês atendem aos sábados?",
+    "Onde fica a clínica?",
+    "Como faço para cancelar uma consulta?",
+] + [f"Tenho uma dúvida sobre o tratamento número {n}" for n in range(30)]
+
+PDF_QUESTIONS = [
+    "Quais convênios a clínica atende?",
+    "Quanto tempo de jejum para o exame de sangue?",
+    "Qual o horário de funcionamento aos sábados?",
+]
+
+DATE_EXPRESSIONS = ["amanhã", "depois de amanhã", "segunda", "sexta", "dia 20", "semana que vem"]
+
+
+def load_domain(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+class Conversation:
+    """Monta as chamadas ao /webhook de uma conversa, acumulando os slots como o Rasa faria."""
+
+    def __init__(self, domain: Dict[str, Any]) -> None:
+        self.domain = domain
+        self.sender_id = uuid.uuid4().hex
+        self.slots: Dict[str, Any] = {}
+
+    def payload(self, action: str, text: str, new_slots: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        events: List[Dict[str, Any]] = [
+            {"event": "user", "text": text, "parse_data": {"text": text, "intent": {}, "entities": []},
+             "input_channel": "rest"},
+        ]
+        # Slots preenchidos neste turno: é o que a validação do formulário confere
+        for name, value in (new_slots or {}).items():
+            events.append({"event": "slot", "name": name, "value": value})
+        slots = {**self.slots, **(new_slots or {})}
+        return {
+            "next_action": action,
+            "sender_id": self.sender_id,
+            "version": "3.6.0",
+            "domain": self.domain,
+            "tracker": {
+                "sender_id": self.sender_id,
+                "slots": slots,
+                "latest_message": {"text": text, "intent": {}, "entities": []},
+                "events": events,
+                "latest_input_channel": "rest",
+                "latest_action_name": "action_listen",
+                "paused": False,
+                "followup_action": None,
+                "active_loop": {"name": "formulario_agendamento"} if action.startswith("validate_") else {},
+            },
+        }
+
+    def apply(self, response: Dict[str, Any]) -> None:
+        for event in response.get("events", []):
+            if event.get("event") == "slot":
+                self.slots[event["name"]] = event["value"]
+            elif event.get("event") == "reset_slots":
+                self.slots = {}
+
+
+class LoadTest:
+    def __init__(self, url: str, domain: Dict[str, Any], mix: Dict[str, float]) -> None:
+        self.url = url.rstrip("/")
+        self.domain = domain
+        self.mix = mix
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.completed: Dict[str, int] = {}
+
+    async def call(self, session: aiohttp.ClientSession, conversation: Conversation, action: str, text: str,
+                   new_slots: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{self.url}/webhook", json=conversation.payload(action, text, new_slots)) as response:
+                body = await response.json(content_type=None)
+                ok = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError):
+            body, ok = None, False
+        self.latencies.setdefault(action, []).append(time.perf_counter() - start)
+        if not ok:
+            self.errors[action] = self.errors.get(action, 0) + 1
+            return None
+        conversation.apply(body)
+        return body
+
+    async def booking_flow(self, session: aiohttp.ClientSession) -> bool:
+        c = Conversation(self.domain)
+        specialty = random.choice(SPECIALTIES)
+        if await self.call(session, c, "action_extract_info_with_gemini", f"quero marcar {specialty.lower()}") is None:
+            return False
+        if await self.call(session, c, "action_buscar_especialidades", "quais especialidades vocês têm?") is None:
+            return False
+        c.slots["especialidade"] = specialty
+        body = await self.call(session, c, "action_ask_doctor_id", specialty)
+        if not body or not body["responses"] or not body["responses"][0].get("buttons"):
+            return False
+        # Escolhe um médico (ou "Qualquer um") pelo payload do botão, como o frontend faria
+        button = random.choice(body["responses"][0]["buttons"])
+        entities = json.loads(button["payload"][button["payload"].index("{"):])
+        c.slots.update({"doctor_id": entities["doctor_id"], "doctor_name": entities["doctor_name"],
+                        "nome_paciente": "Paciente Teste", "email": f"{c.sender_id[:12]}@exemplo.com"})
+
+        text = random.choice(DATE_EXPRESSIONS)
+        if await self.call(session, c, "validate_formulario_agendamento", text, {"data_preferida": text}) is None:
+            return False
+        offered = c.slots.get("horarios_disponiveis")
+        if not offered or not c.slots.get("data_preferida"):
+            return True  # sem horários na data: conversa termina sem agendar, como na vida real
+        choice = random.choice(offered)
+        if await self.call(session, c, "validate_formulario_agendamento", choice, {"horario_escolhido": choice}) is None:
+            return False
+        return await self.call(session, c, "action_agendar_consulta", "confirmar") is not None
+
+    async def general_flow(self, session: aiohttp.ClientSession) -> bool:
+        c = Conversation(self.domain)
+        return await self.call(session, c, "action_handle_general_question", random.choice(GENERAL_QUESTIONS)) is not None
+
+    async def pdf_flow(self, session: aiohttp.ClientSession) -> bool:
+        c = Conversation(self.domain)
+        return await self.call(session, c, "action_ler_pdf_e_responder", random.choice(PDF_QUESTIONS)) is not None
+
+    async def user(self, session: aiohttp.ClientSession, queue: "asyncio.Queue[str]") -> None:
+        flows = {"booking": self.booking_flow, "general": self.general_flow, "pdf": self.pdf_flow}
+        while True:
+            try:
+                flow = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if await flows[flow](session):
+                self.completed[flow] = self.completed.get(flow, 0) + 1
+
+    async def run(self, users: int, conversations: int) -> float:
+        names = list(self.mix)
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for flow in random.choices(names, weights=[self.mix[n] for n in names], k=conversations):
+            queue.put_nowait(flow)
+        connector = aiohttp.TCPConnector(limit=users)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            start = time.perf_counter()
+            await asyncio.gather(*(self.user(session, queue) for _ in range(users)))
+            return time.perf_counter() - start
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(test: LoadTest, elapsed: float) -> Dict[str, Any]:
+    total_calls = sum(len(samples) for samples in test.latencies.values())
+    actions = {}
+    for action, samples in sorted(test.latencies.items()):
+        ordered = sorted(samples)
+        actions[action] = {
+            "calls": len(ordered),
+            "errors": test.errors.get(action, 0),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        }
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(total_calls / elapsed, 2),
+        "conversations_per_s": round(sum(test.completed.values()) / elapsed, 2),
+        "completed": dict(test.completed),
+        "actions": actions,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressões acima do limite: vazão menor ou p95 maior por ação."""
+    regressions = []
+    if result["calls_per_s"] < baseline["calls_per_s"] * (1 - max_regression):
+        regressions.append(f"vazão: {baseline['calls_per_s']} -> {result['calls_per_s']} chamadas/s")
+    for action, stats in result["actions"].items():
+        before = baseline["actions"].get(action)
+        if before and stats["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{action} p95: {before['p95_ms']} -> {stats['p95_ms']} ms")
+    return regressions
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    print(f"duração: {summary['elapsed_s']}s  vazão: {summary['calls_per_s']} chamadas/s  "
+          f"{summary['conversations_per_s']} conversas/s  concluídas: {summary['completed']}")
+    print(f"{'ação':40s} {'chamadas':>9} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for action, stats in summary["actions"].items():
+        print(f"{action:40s} {stats['calls']:>9} {stats['errors']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+
+
+async def wait_for_server(url: str, process: Optional[subprocess.Popen], timeout: float = 90) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError("O servidor de ações terminou antes de ficar pronto")
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("O servidor de ações não respondeu a tempo")
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+    _, db_runner, db_url = await start_fake_db_api(latency=args.db_latency, jitter=args.db_latency / 2)
+    print(f"API do banco falsa em {db_url}")
+
+    process = None
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        url = args.url
+        if not url:
+            pdf_path = os.path.join(tmp.name, "material.pdf")
+            build_synthetic_pdf(pdf_path, args.pdf_pages)
+            env = dict(
+                os.environ,
+                ACTION_SERVER_PORT=str(args.port),
+                DATABASE_API_URL=db_url,
+                LLM_BACKEND="fake",
+                FAKE_LLM_LATENCY=str(args.llm_latency),
+                KNOWLEDGE_PDF_PATH=pdf_path,
+                KNOWLEDGE_DIR=os.path.join(tmp.name, "knowledge"),
+                LLM_CACHE_DB="",
+            )
+            process = subprocess.Popen(shlex.split(args.server_cmd), env=env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            url = f"http://127.0.0.1:{args.port}"
+        await wait_for_server(url, process)
+
+        test = LoadTest(url, load_domain(args.domain), mix)
+        elapsed = await test.run(args.users, args.conversations)
+        return summarize(test, elapsed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        await db_runner.cleanup()
+        tmp.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="usuários virtuais simultâneos")
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--mix", default="booking=0.6,general=0.25,pdf=0.15")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="latência da API do banco falsa (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="latência do Gemini falso (s)")
+    parser.add_argument("--pdf-pages", type=int, default=40)
+    parser.add_argument("--url", help="servidor de ações já em execução (não sobe um novo)")
+    parser.add_argument("--server-cmd", default=f"{sys.executable} -m actions.custom_actions_server")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--domain", default="domain.yml")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="grava o resultado em JSON para servir de referência")
+    parser.add_argument("--baseline", help="JSON gravado com --save para comparação")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    summary = asyncio.run(main_async(args))
+    print_report(summary)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(summary, json.load(f), args.max_regression)
+        if regressions:
+            print("regressões em relação à referência:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("sem regressões em relação à referência")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +0,0 @@
-export {};
-//# sourceMappingURL=example.d.ts.map
\ No newline at end of file
@@ -1,2 +0,0 @@
-export {};
-//# sourceMappingURL=seed.d.ts.map
\ No newline at end of file
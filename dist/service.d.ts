@@ -1,2 +0,0 @@
-export {};
-//# sourceMappingURL=service.d.ts.map
\ No newline at end of file
@@ -128,6 +128,28 @@ document.addEventListener("DOMContentLoaded", () => {
         chatMessagesContainer.scrollTop = chatMessagesContainer.scrollHeight;
     }
 
+    function appendStreamingMessage(streamUrl) {
+        if (!chatMessagesContainer) return;
+        const messageElement = createMessageBlock("", "bot");
+        const bubble = messageElement.querySelector(".message-bubble");
+        chatMessagesContainer.appendChild(messageElement);
+
+        let answer = "";
+        const source = new EventSource(streamUrl);
+        source.onmessage = (event) => {
+            answer += JSON.parse(event.data).text;
+            bubble.innerHTML = answer.replace(/\n/g, '<br>');
+            chatMessagesContainer.scrollTop = chatMessagesContainer.scrollHeight;
+        };
+        source.addEventListener("end", () => source.close());
+        source.addEventListener("error", () => {
+            source.close();
+            if (!answer) {
+                bubble.textContent = "Desculpe, não entendi o que você quis dizer. Poderia reformular?";
+            }
+        });
+    }
+
     async function sendMessageToRasaAPI(messageText) {
         if (!messageText && messageText !== 0) return;
 
@@ -150,7 +172,11 @@ document.addEventListener("DOMContentLoaded", () => {
             if (botResponses && botResponses.length > 0) {
                 botResponses.forEach((botMsg, index) => {
                     setTimeout(() => {
-                        appendMessage(botMsg.text, "bot", botMsg.image, botMsg.buttons);
+                        if (botMsg.custom && botMsg.custom.stream_url) {
+                            appendStreamingMessage(botMsg.custom.stream_url);
+                        } else {
+                            appendMessage(botMsg.text, "bot", botMsg.image, botMsg.buttons);
+                        }
                     }, 200 * (index + 1));
                 });
             } else if (typeof messageText === 'string' && !messageText.startsWith("/")) {
@@ -0,0 +1,10 @@
+-- AlterTable
+ALTER TABLE "Appointment" ADD COLUMN "idempotencyKey" TEXT;
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Appointment_idempotencyKey_key" ON "Appointment"("idempotencyKey");
+
+-- CreateIndex
+-- Um horário de um médico só pode ter um agendamento ativo: a checagem e a inserção
+-- ficam atômicas mesmo com várias requisições concorrentes
+CREATE UNIQUE INDEX "Appointment_doctorId_dateTime_active_key" ON "Appointment"("doctorId", "dateTime") WHERE "status" <> 'CANCELLED';
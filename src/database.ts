@@ -1,7 +1,27 @@
-import { PrismaClient, Specialty, Doctor, Patient, Appointment } from '@prisma/client';
+import { PrismaClient, Prisma, Specialty, Doctor, Patient, Appointment } from '@prisma/client';
 // Initialize Prisma Client
 const prisma = new PrismaClient();
 
+// O horário pedido já foi ocupado (ou não é atendido pelo médico)
+export class SlotUnavailableError extends Error {
+  constructor() {
+    super('Horário indisponível.');
+    this.name = 'SlotUnavailableError';
+  }
+}
+
+// Índice único parcial criado pela migração booking_idempotency (ver schema.prisma)
+export const ACTIVE_SLOT_INDEX = 'Appointment_doctorId_dateTime_active_key';
+
+const appointmentInclude = {
+  patient: true,
+  doctor: {
+    include: {
+      specialty: true
+    }
+  }
+};
+
 // Database service class
 export class DatabaseService {
   private prisma: PrismaClient;
@@ -80,7 +100,12 @@ export class DatabaseService {
     return await this.prisma.doctor.findMany({
       where: { specialtyId },
       include: {
-        specialty: true
+        specialty: true,
+        // Agenda semanal: o bot recusa sozinho as datas em que o médico não atende
+        availability: {
+          select: { dayOfWeek: true, startTime: true, endTime: true },
+          orderBy: { dayOfWeek: 'asc' }
+        }
       }
     });
   }
@@ -94,6 +119,21 @@ export class DatabaseService {
     });
   }
 
+  async getDoctorsByIds(doctorIds: number[]) {
+    return await this.prisma.doctor.findMany({
+      where: { id: { in: doctorIds } },
+      include: {
+        specialty: true
+      }
+    });
+  }
+
+  async getAvailabilitiesByDoctors(doctorIds: number[]) {
+    return await this.prisma.doctorAvailability.findMany({
+      where: { doctorId: { in: doctorIds } },
+    });
+  }
+
   async getAvailabilityByDoctor(doctorId: number, dayOfWeek: number) {
     return await this.prisma.doctorAvailability.findUnique({
       where: {
@@ -143,6 +183,68 @@ export class DatabaseService {
     });
   }
 
+  // Só agendamentos ativos: uma chave cujo agendamento foi cancelado não conta como reserva feita
+  async getAppointmentByIdempotencyKey(idempotencyKey: string) {
+    return await this.prisma.appointment.findFirst({
+      where: { idempotencyKey, status: { not: 'CANCELLED' } },
+      include: appointmentInclude
+    });
+  }
+
+  // Encontra/cria o paciente e cria o agendamento em uma única transação.
+  // O índice único parcial em (doctorId, dateTime) garante que dois pedidos simultâneos
+  // não ocupem o mesmo horário; repetir a mesma idempotencyKey devolve o agendamento existente.
+  async bookAppointment(data: {
+    email: string;
+    name: string;
+    doctorId: number;
+    dateTime: Date;
+    idempotencyKey: string;
+  }): Promise<{ appointment: Appointment; created: boolean }> {
+    const existing = await this.getAppointmentByIdempotencyKey(data.idempotencyKey);
+    if (existing) {
+      return { appointment: existing, created: false };
+    }
+
+    try {
+      const appointment = await this.prisma.$transaction(async (tx) => {
+        const patient = await tx.patient.upsert({
+          where: { email: data.email },
+          update: {},
+          create: { email: data.email, name: data.name }
+        });
+
+        const clash = await tx.appointment.findFirst({
+          where: { doctorId: data.doctorId, dateTime: data.dateTime, status: { not: 'CANCELLED' } }
+        });
+        if (clash) {
+          throw new SlotUnavailableError();
+        }
+
+        return await tx.appointment.create({
+          data: {
+            patientId: patient.id,
+            doctorId: data.doctorId,
+            dateTime: data.dateTime,
+            idempotencyKey: data.idempotencyKey
+          },
+          include: appointmentInclude
+        });
+      });
+      return { appointment, created: true };
+    } catch (error) {
+      // Violação de unicidade: outra requisição concorrente terminou primeiro
+      if (error instanceof Prisma.PrismaClientKnownRequestError && error.code === 'P2002') {
+        const replay = await this.getAppointmentByIdempotencyKey(data.idempotencyKey);
+        if (replay) {
+          return { appointment: replay, created: false };
+        }
+        throw new SlotUnavailableError();
+      }
+      throw error;
+    }
+  }
+
   async getAppointmentsByPatient(patientId: number) {
     return await this.prisma.appointment.findMany({
       where: { patientId },
@@ -174,7 +276,8 @@ export class DatabaseService {
   async updateAppointmentStatus(id: number, status: 'SCHEDULED' | 'CONFIRMED' | 'CANCELLED' | 'COMPLETED') {
     return await this.prisma.appointment.update({
       where: { id },
-      data: { status },
+      // Ao cancelar, a idempotencyKey é liberada para que um novo pedido com ela possa reservar de novo
+      data: status === 'CANCELLED' ? { status, idempotencyKey: null } : { status },
       include: {
         patient: true,
         doctor: {
@@ -205,7 +308,30 @@ export class DatabaseService {
     });
   }
 
+  async getAppointmentsByDoctorsInRange(doctorIds: number[], start: Date, end: Date) {
+    return await this.prisma.appointment.findMany({
+      where: {
+        doctorId: { in: doctorIds },
+        dateTime: {
+          gte: start,
+          lte: end,
+        },
+      },
+      orderBy: {
+        dateTime: 'asc',
+      },
+    });
+  }
+
   
+  // O schema.prisma não declara o índice parcial; um `prisma migrate dev` com drift pode removê-lo
+  async hasActiveSlotIndex(): Promise<boolean> {
+    const rows = await this.prisma.$queryRaw<{ indexname: string }[]>`
+      SELECT indexname FROM pg_indexes
+      WHERE tablename = 'Appointment' AND indexname = ${ACTIVE_SLOT_INDEX}`;
+    return rows.length > 0;
+  }
+
   // Utility method to disconnect from database
   async disconnect() {
     await this.prisma.$disconnect();
@@ -1,5 +1,5 @@
 import express from 'express';
-import { db } from './database';
+import { db, SlotUnavailableError, ACTIVE_SLOT_INDEX } from './database';
 import { PrismaClient } from '@prisma/client';
 
 const prisma = new PrismaClient();
@@ -14,6 +14,10 @@ app.use(express.json());
     return this.toString();
 };
 
+const DAY_MS = 24 * 60 * 60 * 1000;
+// Limite do intervalo aceito por /available-slots
+const MAX_RANGE_DAYS = 31;
+
 // --- Funções Auxiliares ---
 function generateTimeSlots(start: string, end: string, intervalMinutes: number): string[] {
     const slots = [];
@@ -96,6 +100,81 @@ app.get('/doctors/:doctorId/available-slots', async (req, res, next) => {
     }
 });
 
+// GET /available-slots?specialtyId=1&from=YYYY-MM-DD&to=YYYY-MM-DD (ou doctorIds=1,2,3)
+// Retorna, em uma única chamada, os horários livres de vários médicos em um intervalo de datas
+app.get('/available-slots', async (req, res, next) => {
+    try {
+        const fromStr = req.query.from as string;
+        const toStr = (req.query.to as string) || fromStr;
+
+        if (!fromStr || !/^\d{4}-\d{2}-\d{2}$/.test(fromStr) || !/^\d{4}-\d{2}-\d{2}$/.test(toStr)) {
+            return res.status(400).json({ error: 'Parâmetros from/to são obrigatórios no formato YYYY-MM-DD.' });
+        }
+
+        const from = new Date(`${fromStr}T00:00:00.000Z`);
+        const to = new Date(`${toStr}T23:59:59.999Z`);
+        const totalDays = Math.floor((to.getTime() - from.getTime()) / DAY_MS) + 1;
+        if (totalDays < 1 || totalDays > MAX_RANGE_DAYS) {
+            return res.status(400).json({ error: `O intervalo deve ter entre 1 e ${MAX_RANGE_DAYS} dias.` });
+        }
+
+        let doctors;
+        if (req.query.specialtyId) {
+            const specialtyId = parseInt(req.query.specialtyId as string, 10);
+            if (isNaN(specialtyId)) {
+                return res.status(400).json({ error: 'ID da especialidade inválido.' });
+            }
+            doctors = await db.getDoctorsBySpecialty(specialtyId);
+        } else if (req.query.doctorIds) {
+            const doctorIds = (req.query.doctorIds as string).split(',').map(id => parseInt(id, 10));
+            if (doctorIds.some(isNaN)) {
+                return res.status(400).json({ error: 'Lista de IDs de médicos inválida.' });
+            }
+            doctors = await db.getDoctorsByIds(doctorIds);
+        } else {
+            return res.status(400).json({ error: 'Informe specialtyId ou doctorIds.' });
+        }
+
+        const doctorIds = doctors.map(d => d.id);
+        const [availabilities, appointments] = await Promise.all([
+            db.getAvailabilitiesByDoctors(doctorIds),
+            db.getAppointmentsByDoctorsInRange(doctorIds, from, to),
+        ]);
+
+        const availabilityByDoctorDay = new Map(availabilities.map(a => [`${a.doctorId}:${a.dayOfWeek}`, a]));
+        const bookedByDoctorDate = new Map<string, Set<string>>();
+        for (const appointment of appointments) {
+            const iso = appointment.dateTime.toISOString();
+            const key = `${appointment.doctorId}:${iso.substring(0, 10)}`;
+            if (!bookedByDoctorDate.has(key)) {
+                bookedByDoctorDate.set(key, new Set());
+            }
+            bookedByDoctorDate.get(key)!.add(iso.substring(11, 16));
+        }
+
+        // Mesma semântica de /doctors/:doctorId/available-slots, aplicada a cada médico/dia
+        const result = [];
+        for (let day = 0; day < totalDays; day++) {
+            const targetDate = new Date(from.getTime() + day * DAY_MS + 12 * 60 * 60 * 1000);
+            const dateStr = targetDate.toISOString().substring(0, 10);
+            const dayOfWeek = targetDate.getUTCDay();
+
+            for (const doctor of doctors) {
+                const availability = availabilityByDoctorDay.get(`${doctor.id}:${dayOfWeek}`);
+                const booked = bookedByDoctorDate.get(`${doctor.id}:${dateStr}`) || new Set<string>();
+                const slots = availability
+                    ? generateTimeSlots(availability.startTime, availability.endTime, 60).filter(slot => !booked.has(slot))
+                    : [];
+                result.push({ doctorId: doctor.id, doctorName: doctor.name, date: dateStr, slots });
+            }
+        }
+
+        res.json(result);
+    } catch (error) {
+        next(error);
+    }
+});
+
 // POST /patients - Encontra ou cria um paciente
 app.post('/patients', async (req, res, next) => {
     try {
@@ -128,13 +207,55 @@ app.post('/appointments', async (req, res, next) => {
     }
 });
 
+// POST /bookings - Encontra ou cria o paciente e agenda a consulta em uma única chamada
+// Body: { email, name, doctorId, dateTime, idempotencyKey }. Repetir a mesma idempotencyKey
+// devolve o agendamento já criado (200) em vez de duplicá-lo; horário ocupado responde 409.
+app.post('/bookings', async (req, res, next) => {
+    try {
+        const { email, name, idempotencyKey } = req.body;
+        const doctorId = parseInt(req.body.doctorId, 10);
+        const dateTime = new Date(req.body.dateTime);
+
+        if (!email || !name || !idempotencyKey) {
+            return res.status(400).json({ error: 'Email, nome e idempotencyKey são obrigatórios.' });
+        }
+        if (isNaN(doctorId) || isNaN(dateTime.getTime())) {
+            return res.status(400).json({ error: 'Médico ou data/hora inválidos.' });
+        }
+
+        // O horário precisa fazer parte da agenda do médico naquele dia da semana
+        const availability = await db.getAvailabilityByDoctor(doctorId, dateTime.getUTCDay());
+        const time = dateTime.toISOString().substring(11, 16);
+        if (!availability || !generateTimeSlots(availability.startTime, availability.endTime, 60).includes(time)) {
+            return res.status(409).json({ error: 'Horário indisponível.', code: 'SLOT_UNAVAILABLE' });
+        }
+
+        const { appointment, created } = await db.bookAppointment({ email, name, doctorId, dateTime, idempotencyKey });
+        res.status(created ? 201 : 200).json(appointment);
+    } catch (error) {
+        if (error instanceof SlotUnavailableError) {
+            return res.status(409).json({ error: error.message, code: 'SLOT_UNAVAILABLE' });
+        }
+        next(error);
+    }
+});
+
 // Middleware para tratamento de erros
 app.use((err: Error, req: express.Request, res: express.Response, next: express.NextFunction) => {
     console.error(err.stack);
     res.status(500).json({ error: 'Ocorreu um erro interno no servidor.' });
 });
 
-// Inicia o servidor
-app.listen(port, () => {
-    console.log(`Servidor da API rodando na porta ${port}`);
+// Inicia o servidor, depois de conferir o índice que impede dois agendamentos no mesmo horário
+db.hasActiveSlotIndex().then((exists) => {
+    if (!exists) {
+        console.error(`Índice ${ACTIVE_SLOT_INDEX} ausente: rode \`npx prisma migrate deploy\` antes de subir a API.`);
+        process.exit(1);
+    }
+    app.listen(port, () => {
+        console.log(`Servidor da API rodando na porta ${port}`);
+    });
+}).catch((error) => {
+    console.error('Não foi possível verificar os índices do banco:', error);
+    process.exit(1);
 });
\ No newline at end of file
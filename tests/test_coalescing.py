@@ -0,0 +1,97 @@
+import asyncio
+
+from actions.db_client import AsyncDbServiceClient
+from actions.fake_llm import FakeGenerativeModel
+from actions.llm_cache import LLMResponseCache
+from actions.llm_gateway import LLMGateway
+from actions.single_flight import SingleFlight
+from benchmarks.fake_db_api import start_fake_db_api
+
+
+async def _db_burst(coalesce: bool, reads: int = 100):
+    api, runner, url = await start_fake_db_api(latency=0.05)
+    client = AsyncDbServiceClient(base_url=url, coalesce=coalesce)
+    try:
+        half = reads // 2
+        results = await asyncio.gather(
+            *(client.call("getSpecialties") for _ in range(half)),
+            *(client.call("getAvailableSlotsByDoctorAndDate", "1", "2025-03-12") for _ in range(half)),
+        )
+        return api.requests, results[:half], results[half:]
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def test_identical_db_reads_share_one_call_per_url():
+    calls, specialties, slots = asyncio.run(_db_burst(coalesce=True))
+
+    assert calls == 2
+    assert specialties[0] and all(r == specialties[0] for r in specialties)
+    assert slots[0] is not None and all(r == slots[0] for r in slots)
+
+
+def test_db_reads_are_not_coalesced_when_disabled():
+    calls, _, _ = asyncio.run(_db_burst(coalesce=False))
+
+    assert calls == 100
+
+
+def test_identical_questions_make_one_llm_call():
+    model = FakeGenerativeModel(latency=0.05)
+    gateway = LLMGateway(model=model, max_concurrency=100, queue_timeout=None)
+    cache = LLMResponseCache(db_path="")
+
+    async def burst():
+        return await asyncio.gather(*(
+            cache.generate_shared("Quais convênios vocês aceitam?", "1", lambda: gateway.generate("convênios"))
+            for _ in range(50)
+        ))
+
+    answers = asyncio.run(burst())
+
+    assert model.calls == 1
+    assert len(set(answers)) == 1
+    assert cache.get("quais convenios voces aceitam", "1") == answers[0]
+    assert cache.flights.coalesced == 49
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("key", slow))
+        second = asyncio.ensure_future(flights.do("key", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "ok"
+    assert flights.calls == 1
+
+
+def test_forget_starts_a_new_call_for_later_callers():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario():
+        before = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        flights.forget("key")
+        after = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.gather(before, after)
+        return flights.stats()["in_flight"]
+
+    in_flight = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert in_flight == 0
@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+from actions.date_parser import find_date_expression, parse_date_expression
+from benchmarks.date_corpus import CORPUS, REFERENCE_DATE
+
+
+@pytest.mark.parametrize("text,start,end", CORPUS, ids=[text for text, _, _ in CORPUS])
+def test_corpus(text, start, end):
+    result = parse_date_expression(text, REFERENCE_DATE)
+    got = (result.start, result.end) if result else (None, None)
+
+    assert got == (start, end)
+
+
+def test_relative_dates_follow_the_reference_day():
+    # O resultado guardado para um dia não vale para o dia seguinte
+    assert parse_date_expression("amanhã", date(2025, 3, 12)).start == date(2025, 3, 13)
+    assert parse_date_expression("amanhã", date(2025, 3, 13)).start == date(2025, 3, 14)
+
+
+def test_match_span_points_into_the_original_text():
+    text = "Pode ser na SEXTA-FEIRA à tarde?"
+    match = find_date_expression(text, REFERENCE_DATE)
+
+    assert match.text == "SEXTA-FEIRA"
+    assert text[match.span[0]:match.span[1]] == match.text
@@ -0,0 +1,30 @@
+import pytest
+
+from actions.entity_extractor import extract_entities
+
+
+@pytest.mark.parametrize("text,name", [
+    ("Meu nome é João Silva", "João Silva"),
+    ("meu nome é Ana Silva", "Ana Silva"),
+    ("Me chamo Beatriz Costa e quero marcar uma consulta", "Beatriz Costa"),
+    ("Sou a Maria das Graças", "Maria das Graças"),
+    ("Meu nome completo é Amanda Nogueira da Silva", "Amanda Nogueira da Silva"),
+    ("O nome é Helena Dias", "Helena Dias"),
+    ("o nome do paciente é Luzia Ferreira", "Luzia Ferreira"),
+    ("Nome: Roberto Carlos Braga", "Roberto Carlos Braga"),
+    ("Paciente: Silvio Santos de Oliveira", "Silvio Santos de Oliveira"),
+    ("A paciente se chama Júlia Gomes", "Júlia Gomes"),
+    ("Pode colocar no nome de Camila Ribeiro", "Camila Ribeiro"),
+])
+def test_patient_name_after_trigger_phrase(text, name):
+    assert extract_entities(text, None).slots.get("nome_paciente") == name
+
+
+@pytest.mark.parametrize("text", [
+    # Só a frase que introduz é livre de maiúsculas; o nome precisa vir capitalizado
+    "meu nome é ana",
+    "sou de Curitiba",
+    "Sou paciente da Dra. Ana",
+])
+def test_no_patient_name_without_a_capitalised_name(text):
+    assert "nome_paciente" not in extract_entities(text, None).slots
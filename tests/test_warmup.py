@@ -0,0 +1,83 @@
+import asyncio
+import gc
+
+import pytest
+
+from actions import warmup
+
+
+class _KnowledgeBase:
+    def __init__(self, error=None):
+        self.error = error
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def warm_up(monkeypatch, tmp_path):
+    knowledge_base = _KnowledgeBase()
+    gazetteers = []
+    models = []
+
+    async def get_gazetteer():
+        gazetteers.append(1)
+
+    monkeypatch.setattr(warmup, "ACTIONS_WARM_UP_LOCK", str(tmp_path / "warmup.lock"))
+    monkeypatch.setattr(warmup, "get_knowledge_base", lambda: knowledge_base)
+    monkeypatch.setattr(warmup, "get_gazetteer", get_gazetteer)
+    monkeypatch.setattr(warmup, "warm_up_model", lambda: models.append(1))
+    return knowledge_base, gazetteers, models
+
+
+def test_first_worker_warms_the_shared_part(warm_up):
+    knowledge_base, gazetteers, models = warm_up
+
+    asyncio.run(warmup.warm_up_async())
+
+    assert (knowledge_base.refreshes, len(gazetteers), len(models)) == (1, 1, 1)
+
+
+@pytest.mark.skipif(warmup.fcntl is None, reason="sem flock")
+def test_later_workers_skip_the_shared_part_while_it_is_being_warmed(warm_up):
+    knowledge_base, gazetteers, models = warm_up
+    is_first, lock_file = warmup.try_acquire_warm_up_lock()
+    try:
+        asyncio.run(warmup.warm_up_async())
+    finally:
+        warmup.release_warm_up_lock(lock_file)
+
+    assert is_first
+    assert (knowledge_base.refreshes, len(gazetteers), len(models)) == (0, 0, 1)
+
+
+def test_model_is_awaited_when_refresh_fails(warm_up, monkeypatch):
+    knowledge_base, gazetteers, models = warm_up
+    knowledge_base.error = OSError("pdf ilegível")
+    model_error = RuntimeError("sem chave")
+    unretrieved = []
+
+    def warm_up_model():
+        raise model_error
+
+    def exception_handler(loop, context):
+        unretrieved.append(context)
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(exception_handler)
+        await warmup.warm_up_async()
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+    monkeypatch.setattr(warmup, "warm_up_model", warm_up_model)
+    asyncio.run(scenario())
+
+    assert knowledge_base.refreshes == 1
+    assert unretrieved == []
+    # O lock foi liberado: o próximo worker pode aquecer
+    is_first, lock_file = warmup.try_acquire_warm_up_lock()
+    warmup.release_warm_up_lock(lock_file)
+    assert is_first